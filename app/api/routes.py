@@ -1,9 +1,15 @@
 """API routes."""
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Request, Response
+from fastapi.responses import JSONResponse, HTMLResponse, ORJSONResponse
+from collections import Counter
 from datetime import datetime
+from typing import Any, Optional, Tuple
+import asyncio
+import hashlib
 import json
+import time
+import orjson
 
 from app.models.schemas import (
     QueryRequest, 
@@ -16,119 +22,340 @@ from app.services.clickhouse import clickhouse_service
 from app.services.websocket import websocket_listener
 from app.services.cache import data_cache
 from app.core.config import settings
+from app.core.log import get_logger
 
 from app.controllers.matching_controller import matching_controller
 
-router = APIRouter()
+logger = get_logger(__name__)
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Root payload only depends on settings, so encode it once at import time
+_ROOT_BODY = orjson.dumps({
+    "service": settings.APP_NAME,
+    "version": settings.APP_VERSION,
+    "status": "running",
+    "websocket_url": settings.WEBSOCKET_URL,
+    "endpoints": {
+        "health": "/health",
+        "query": "/query",
+        "monitor_ui": "/monitor",
+        "cache_stats": "/cache/stats",
+        "cache_recent": "/cache/recent",
+        "cache_clear": "/cache/clear",
+        "listener_status": "/listener/status",
+        "listener_start": "/listener/start",
+        "listener_stop": "/listener/stop",
+        "matching": "/matching"
+    }
+})
+
+_CACHE_CLEARED_BODY = orjson.dumps({"message": "Cache cleared successfully"})
+
+_MONITOR_NOT_FOUND_HTML = b"""
+        <html>
+        <body>
+        <h1>Monitor Dashboard Not Found</h1>
+        <p>The monitoring dashboard HTML file is missing. Please ensure static/monitor.html exists.</p>
+        <p><a href="/docs">View API Documentation</a> to use REST endpoints directly.</p>
+        </body>
+        </html>
+        """
+
+# Short-lived /health result: (monotonic timestamp, encoded body)
+_HEALTH_CACHE_TTL_S = 1.0
+_health_cache: Optional[Tuple[float, bytes]] = None
+_health_lock = asyncio.Lock()
+
+# Encoded /ws initial_data frame body without its timestamp:
+# (cache version, monotonic build time, body). The version only tracks this
+# process's writes, so the body is also rebuilt after a short TTL to pick up
+# other writers and expiry.
+_INITIAL_FRAME_TTL_S = 1.0
+_initial_frame_cache: Optional[Tuple[int, float, str]] = None
+
+# /ws micro-batching limits for clients that opt in with ?batch=1
+_WS_BATCH_MAX = 32
+_WS_BATCH_WAIT_S = 0.001
+
+# /ws connect/disconnect counts, reported periodically instead of per event
+_ws_events: Counter = Counter()
+
+# Last formatted timestamp: (epoch milliseconds, ISO string)
+_ts_cache: Tuple[int, str] = (0, "")
+
+# Fixed JSON envelope of the /ws "received" ack; only message and timestamp vary
+_RECEIVED_PREFIX = '{"status":"received","message":'
+_RECEIVED_MID = ',"timestamp":"'
+_RECEIVED_SUFFIX = '"}'
+
+# Cache stats bumped by reads, left out of /cache/recent so polls can revalidate
+_READ_COUNTERS = ("cache_hits", "cache_misses")
+
+# Dashboard HTML, loaded lazily on the first /monitor request
+_MONITOR_HTML: Optional[bytes] = None
+
+
+def _load_monitor_html() -> bytes:
+    """Read the monitoring dashboard HTML from disk."""
+    with open("static/monitor.html", "rb") as f:
+        return f.read()
+
+
+def _now_iso() -> str:
+    """Current local time as ISO string, formatted at most once per millisecond."""
+    global _ts_cache
+    now_ms = int(time.time() * 1000)
+    cached = _ts_cache
+    if cached[0] != now_ms:
+        cached = (now_ms, datetime.fromtimestamp(now_ms / 1000).isoformat(timespec="milliseconds"))
+        _ts_cache = cached
+    return cached[1]
 
 
 @router.get("/")
 async def root():
     """Root endpoint - service information."""
-    return {
-        "service": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-        "status": "running",
-        "websocket_url": settings.WEBSOCKET_URL,
-        "endpoints": {
-            "health": "/health",
-            "query": "/query",
-            "monitor_ui": "/monitor",
-            "cache_stats": "/cache/stats",
-            "cache_recent": "/cache/recent",
-            "cache_clear": "/cache/clear",
-            "listener_status": "/listener/status",
-            "listener_start": "/listener/start",
-            "listener_stop": "/listener/stop",
-            "matching": "/matching"
-        }
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
-    clickhouse_status = "connected" if clickhouse_service.test_connection() else "disconnected"
+    global _health_cache
     
-    # Check Redis status from cache backend
-    cache_stats = data_cache.get_stats()
-    redis_status = "connected" if cache_stats.get("backend") == "redis" else "disconnected"
+    # Serve a recent result so probe bursts collapse onto one backend check
+    cached = _health_cache
+    if cached and time.monotonic() - cached[0] < _HEALTH_CACHE_TTL_S:
+        return Response(content=cached[1], media_type="application/json")
     
-    return HealthResponse(
-        status="ok",
-        clickhouse=clickhouse_status,
-        redis=redis_status,
-        timestamp=datetime.now()
-    )
+    async with _health_lock:
+        # Another request may have refreshed the cache while we waited
+        cached = _health_cache
+        if cached and time.monotonic() - cached[0] < _HEALTH_CACHE_TTL_S:
+            return Response(content=cached[1], media_type="application/json")
+        
+        # Run both probes in parallel; the Redis one blocks, so off the event loop
+        clickhouse_ok, cache_stats = await asyncio.gather(
+            clickhouse_service.test_connection(),
+            asyncio.to_thread(data_cache.get_stats)
+        )
+        clickhouse_status = "connected" if clickhouse_ok else "disconnected"
+        
+        # Check Redis status from cache backend
+        redis_status = "connected" if cache_stats.get("backend") == "redis" else "disconnected"
+        
+        # Encode the HealthResponse fields directly, skipping model construction
+        body = orjson.dumps({
+            "status": "ok",
+            "clickhouse": clickhouse_status,
+            "redis": redis_status,
+            "timestamp": _now_iso()
+        })
+        _health_cache = (time.monotonic(), body)
+    
+    return Response(content=body, media_type="application/json")
+
+
+async def report_ws_connections(interval_s: float = 60.0) -> None:
+    """Periodically log aggregated /ws connect/disconnect counts."""
+    while True:
+        await asyncio.sleep(interval_s)
+        if not _ws_events:
+            continue
+        connected = _ws_events["connected"]
+        disconnected = _ws_events["disconnected"]
+        _ws_events.clear()
+        logger.info("🔌 WebSocket clients: +%s connected, -%s disconnected in last %.0fs",
+                    connected, disconnected, interval_s)
+
+
+def _encode_frame(payload: Any) -> str:
+    """Encode a payload as a JSON text frame with orjson."""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+def _encode_received(message: str) -> str:
+    """Encode a /ws "received" ack, splicing the message into a fixed envelope."""
+    return "".join((
+        _RECEIVED_PREFIX,
+        orjson.dumps(message).decode(),
+        _RECEIVED_MID,
+        _now_iso(),
+        _RECEIVED_SUFFIX
+    ))
+
+
+def _get_initial_frame() -> str:
+    """Return the encoded initial_data frame, stamped with the current time."""
+    global _initial_frame_cache
+    
+    version = data_cache.version
+    cached = _initial_frame_cache
+    if not (cached and cached[0] == version and time.monotonic() - cached[1] < _INITIAL_FRAME_TTL_S):
+        recent_data = data_cache.get_recent(limit=50)
+        body = _encode_frame({
+            "type": "initial_data",
+            "data": recent_data,
+            "cache_stats": data_cache.get_stats()
+        })
+        cached = (version, time.monotonic(), body)
+        _initial_frame_cache = cached
+    
+    # Splice a fresh timestamp in as the last field
+    return "".join((cached[2][:-1], ',"timestamp":"', _now_iso(), '"}'))
+
+
+def _enqueue(queue: asyncio.Queue, writer: asyncio.Task, frame: str) -> bool:
+    """
+    Queue a frame for a /ws client's writer task without blocking.
+    
+    Returns:
+        False if the writer has stopped or the client is not reading its queue
+    """
+    if writer.done():
+        return False
+    try:
+        queue.put_nowait(frame)
+    except asyncio.QueueFull:
+        return False
+    return True
+
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for clients to connect and receive data."""
     await websocket.accept()
-    websocket_listener.add_client(websocket)
-    print("✓ Client connected to WebSocket")
+    queue = websocket_listener.add_client(websocket)
+    writer = asyncio.create_task(websocket_listener.client_writer(websocket, queue))
+    _ws_events["connected"] += 1
     
     try:
         # Send initial cache data
-        recent_data = data_cache.get_recent(limit=50)
-        await websocket.send_json({
-            "type": "initial_data",
-            "data": recent_data,
-            "cache_stats": data_cache.get_stats(),
-            "timestamp": datetime.now().isoformat()
-        })
+        frame = await asyncio.to_thread(_get_initial_frame)
         
-        while True:
+        # Clients connecting with ?batch=1 get one ack per drained burst
+        batch_mode = websocket.query_params.get("batch") in ("1", "true")
+        
+        while _enqueue(queue, writer, frame):
             # Keep connection alive and handle incoming messages
             data = await websocket.receive_text()
-            await websocket.send_json({
-                "status": "received",
-                "message": data,
-                "timestamp": datetime.now().isoformat()
+            if not batch_mode:
+                frame = _encode_received(data)
+                continue
+            
+            # Drain messages already pipelined by the client
+            batch = [data]
+            while len(batch) < _WS_BATCH_MAX:
+                try:
+                    batch.append(await asyncio.wait_for(
+                        websocket.receive_text(), timeout=_WS_BATCH_WAIT_S
+                    ))
+                except asyncio.TimeoutError:
+                    break
+            
+            frame = _encode_frame({
+                "type": "batch_ack",
+                "messages": batch,
+                "timestamp": _now_iso()
             })
+        
+        # The writer failed or the client stopped reading; drop it
+        _ws_events["disconnected"] += 1
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
     except WebSocketDisconnect:
-        print("✗ Client disconnected from WebSocket")
+        _ws_events["disconnected"] += 1
+    finally:
+        writer.cancel()
         websocket_listener.remove_client(websocket)
 
 
+def _etag(body: bytes) -> str:
+    """Weak ETag derived from the encoded response body."""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _json_with_etag(request: Request, body: bytes) -> Response:
+    """Return the encoded body, or a 304 if the client already holds it."""
+    etag = _etag(body)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, max-age=0"}
+    )
+
+
 @router.get("/cache/stats")
-async def get_cache_stats():
+async def get_cache_stats(request: Request):
     """Get cache statistics."""
-    return data_cache.get_stats()
+    return _json_with_etag(request, orjson.dumps(await asyncio.to_thread(data_cache.get_stats)))
 
 
-@router.get("/cache/recent")
-async def get_recent_cached_data(limit: int = 100):
-    """Get recent cached data."""
-    return {
-        "data": data_cache.get_recent(limit=limit),
-        "stats": data_cache.get_stats()
+def _encode_recent(limit: int, since: Optional[int] = None) -> bytes:
+    """Read recent items (optionally only those after a cursor) and stats, then encode them."""
+    if since is None:
+        rows = data_cache.get_recent(limit=limit)
+    else:
+        rows = data_cache.get_since(since, limit=limit)
+    
+    # Cursor for the next poll: highest sequence number returned
+    next_seq = max((row.get("seq", 0) for row in rows), default=since or 0)
+    
+    # Per-read counters change on every poll (this one included), which would
+    # give each response a new ETag; /cache/stats still reports them
+    stats = {
+        key: value for key, value in data_cache.get_stats().items()
+        if key not in _READ_COUNTERS
     }
+    
+    return orjson.dumps({
+        "data": rows,
+        "next": next_seq,
+        "stats": stats
+    })
+
+
+@router.get("/cache/recent")
+async def get_recent_cached_data(request: Request, limit: int = 100, since: Optional[int] = None):
+    """
+    Get recent cached data.
+    
+    Pass the returned "next" value as since=<cursor> on the following poll
+    to receive the items cached after it, oldest first and at most limit per
+    call; repeat until "data" is empty to page through a backlog.
+    """
+    body = await asyncio.to_thread(_encode_recent, limit, since)
+    return _json_with_etag(request, body)
 
 
 @router.post("/cache/clear")
 async def clear_cache():
     """Clear all cached data."""
-    data_cache.clear()
-    return {"message": "Cache cleared successfully"}
+    await asyncio.to_thread(data_cache.clear)
+    return Response(content=_CACHE_CLEARED_BODY, media_type="application/json")
 
 
 @router.get("/listener/status")
 async def get_listener_status():
     """Get WebSocket listener status."""
-    return websocket_listener.get_status()
+    return ORJSONResponse(content=websocket_listener.get_status())
 
 
 @router.post("/listener/start")
 async def start_listener():
     """Start WebSocket listener."""
-    return websocket_listener.start_listener()
+    return Response(content=orjson.dumps(websocket_listener.start_listener()), media_type="application/json")
 
 
 @router.post("/listener/stop")
 async def stop_listener():
     """Stop WebSocket listener."""
-    return websocket_listener.stop_listener()
+    return Response(content=orjson.dumps(websocket_listener.stop_listener()), media_type="application/json")
 
 
 @router.post("/matching")
@@ -157,16 +384,11 @@ async def process_matching_post(request: MatchingRequest):
 @router.get("/monitor", response_class=HTMLResponse)
 async def monitoring_dashboard():
     """Real-time monitoring dashboard UI."""
-    try:
-        with open("static/monitor.html", "r", encoding="utf-8") as f:
-            return HTMLResponse(content=f.read())
-    except FileNotFoundError:
-        return HTMLResponse(content="""
-        <html>
-        <body>
-        <h1>Monitor Dashboard Not Found</h1>
-        <p>The monitoring dashboard HTML file is missing. Please ensure static/monitor.html exists.</p>
-        <p><a href="/docs">View API Documentation</a> to use REST endpoints directly.</p>
-        </body>
-        </html>
-        """, status_code=404)
\ No newline at end of file
+    global _MONITOR_HTML
+    if _MONITOR_HTML is None:
+        try:
+            # Read off the event loop once, then serve from memory
+            _MONITOR_HTML = await asyncio.to_thread(_load_monitor_html)
+        except FileNotFoundError:
+            return HTMLResponse(content=_MONITOR_NOT_FOUND_HTML, status_code=404)
+    return HTMLResponse(content=_MONITOR_HTML)
@@ -2,14 +2,20 @@
 Matching Controller - Handle AIS-ARPA matching via API.
 """
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+import asyncio
+import math
+import time
+from datetime import datetime, timezone
 import pandas as pd
 import numpy as np
 
 from app.services.clickhouse import clickhouse_service
 from app.core.config import settings
+from app.core.log import get_logger
 from src.matching import ScoringParams, build_candidates, assign_one_to_one
-from src.geo import make_transformer, to_xy, parse_time_s, knots_to_mps
+from src.geo import make_transformer, to_xy_array, parse_time_s_array, knots_to_mps_array
+
+logger = get_logger(__name__)
 
 
 class MatchingController:
@@ -17,33 +23,34 @@ class MatchingController:
     
     def __init__(self):
         """Initialize matching controller."""
-        self.site_lat = getattr(settings, 'SITE_LAT', -1.279656)
-        self.site_lon = getattr(settings, 'SITE_LON', 116.809655)
-        self.filter_radius_km = getattr(settings, 'FILTER_RADIUS_KM', 60.0)
-        self.projection = getattr(settings, 'PROJECTION', 'EPSG:32650')
-        self.gating_distance_m = getattr(settings, 'GATING_DISTANCE_M', 8000.0)
-        self.time_gate_s = getattr(settings, 'TIME_GATE_S', 1800.0)
-        self.match_threshold = getattr(settings, 'MATCH_THRESHOLD', 0.8)
+        self.site_lat = settings.SITE_LAT
+        self.site_lon = settings.SITE_LON
+        self.filter_radius_km = settings.FILTER_RADIUS_KM
+        self.projection = settings.PROJECTION
+        self.gating_distance_m = settings.GATING_DISTANCE_M
+        self.time_gate_s = settings.TIME_GATE_S
+        self.match_threshold = settings.MATCH_THRESHOLD
+        self.use_final = settings.USE_FINAL
         
         # Initialize projection
         self.transformer = make_transformer(self.site_lat, self.site_lon, method=self.projection)
         
         # Scoring parameters
         self.scoring_params = ScoringParams(
-            pos_sigma_m=getattr(settings, 'POS_SIGMA_M', 500.0),
-            spd_sigma_ms=getattr(settings, 'SPD_SIGMA_MS', 3.0),
-            hdg_sigma_deg=getattr(settings, 'HDG_SIGMA_DEG', 40.0),
-            time_sigma_s=getattr(settings, 'TIME_SIGMA_S', 60.0),
-            range_sigma_m=getattr(settings, 'RANGE_SIGMA_M', 1500.0),
-            brg_geo_sigma_deg=getattr(settings, 'BEARING_GEO_SIGMA_DEG', 15.0),
-            w_range=getattr(settings, 'W_RANGE', 0.15),
-            w_brg_geo=getattr(settings, 'W_BRG_GEO', 0.15)
+            pos_sigma_m=settings.POS_SIGMA_M,
+            spd_sigma_ms=settings.SPD_SIGMA_MS,
+            hdg_sigma_deg=settings.HDG_SIGMA_DEG,
+            time_sigma_s=settings.TIME_SIGMA_S,
+            range_sigma_m=settings.RANGE_SIGMA_M,
+            brg_geo_sigma_deg=settings.BEARING_GEO_SIGMA_DEG,
+            w_range=settings.W_RANGE,
+            w_brg_geo=settings.W_BRG_GEO
         )
         
-        print(f"✓ MatchingController initialized")
-        print(f"  Site: ({self.site_lat:.6f}, {self.site_lon:.6f})")
-        print(f"  Radius: {self.filter_radius_km} km")
-        print(f"  Projection: {self.projection}")
+        logger.info("✓ MatchingController initialized")
+        logger.info("  Site: (%.6f, %.6f)", self.site_lat, self.site_lon)
+        logger.info("  Radius: %s km", self.filter_radius_km)
+        logger.info("  Projection: %s", self.projection)
     
     def _calculate_bbox(self, polygon: Optional[List[List[List[float]]]] = None) -> Dict[str, float]:
         """
@@ -55,8 +62,6 @@ class MatchingController:
         Returns:
             Bounding box dict with min/max lat/lon
         """
-        import math
-        
         if polygon and len(polygon) > 0 and len(polygon[0]) > 0:
             # Extract coordinates from polygon
             coords = polygon[0]  # First ring (outer boundary)
@@ -83,42 +88,67 @@ class MatchingController:
                 'max_lon': self.site_lon + lon_delta
             }
     
-    def _point_in_polygon(self, lon: float, lat: float, polygon: List[List[List[float]]]) -> bool:
+    def _polygon_query_part(self, polygon: Optional[List[List[List[float]]]]) -> tuple:
         """
-        Check if point is inside polygon using ray casting algorithm.
+        Build a ClickHouse pointInPolygon predicate and its parameters.
         
         Args:
-            lon: Longitude
-            lat: Latitude
             polygon: GeoJSON polygon coordinates [[[lon, lat], ...]]
             
         Returns:
-            True if point is inside polygon
+            Tuple of (SQL fragment starting with AND, parameters); empty if no polygon
         """
         if not polygon or len(polygon) == 0 or len(polygon[0]) == 0:
-            return True  # No polygon filter, accept all
+            return "", {}  # No polygon filter, accept all
         
-        coords = polygon[0]  # First ring (outer boundary)
-        n = len(coords)
-        inside = False
+        ring = [(float(coord[0]), float(coord[1])) for coord in polygon[0]]
+        return "AND pointInPolygon((lng, lat), {polygon:Array(Tuple(Float64, Float64))})", {'polygon': ring}
+    
+    @staticmethod
+    def _float_values(column: list) -> np.ndarray:
+        """Convert a fetched column to float64, NULL becoming 0.0."""
+        return np.nan_to_num(np.asarray(column, dtype=np.float64), nan=0.0)
+    
+    @staticmethod
+    def _valid_rows(lat: np.ndarray, lon: np.ndarray) -> List[int]:
+        """Indices of rows with coordinates (0, 0 marks a missing position)."""
+        return np.flatnonzero((lat != 0.0) | (lon != 0.0)).tolist()
+    
+    def _dedup_source(self, table: str, key: str, ts_column: str) -> str:
+        """
+        Build the FROM source holding only the latest row per key.
         
-        j = n - 1
-        for i in range(n):
-            xi, yi = coords[i][0], coords[i][1]
-            xj, yj = coords[j][0], coords[j][1]
-            
-            if ((yi > lat) != (yj > lat)) and (lon < (xj - xi) * (lat - yi) / (yj - yi) + xi):
-                inside = not inside
+        Deduplication has to happen before the spatial filter, as FINAL does:
+        a vessel whose latest position is outside the area must be dropped,
+        not reported at an older position that was inside it.
+        
+        Args:
+            table: Table to read
+            key: Column identifying a vessel/target
+            ts_column: Row timestamp column; the newest row per key is kept
             
-            j = i
+        Returns:
+            Table expression for the FROM clause
+        """
+        if self.use_final:
+            return f"{table} FINAL"  # Merge parts at query time
         
-        return inside
+        # The time window only drops keys whose latest row is older than it,
+        # so applying it inside the subquery keeps the result the same
+        return f"""(
+                    SELECT *
+                    FROM {table}
+                    WHERE {ts_column} > toDateTime({{since:UInt32}})
+                    ORDER BY {ts_column} DESC
+                    LIMIT 1 BY {key}
+                )"""
     
     async def fetch_ais_data(
         self,
         since_minutes: int = 60,
         limit: int = 1000,
-        polygon: Optional[List[List[List[float]]]] = None
+        polygon: Optional[List[List[List[float]]]] = None,
+        bbox: Optional[Dict[str, float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Fetch AIS data from ClickHouse.
@@ -127,13 +157,17 @@ class MatchingController:
             since_minutes: Fetch data from last N minutes
             limit: Maximum number of records
             polygon: Optional GeoJSON polygon for spatial filter
+            bbox: Precomputed bounding box (calculated from polygon if omitted)
             
         Returns:
             List of AIS records
         """
         try:
-            bbox = self._calculate_bbox(polygon)
-            since = datetime.utcnow() - timedelta(minutes=since_minutes)
+            if bbox is None:
+                bbox = self._calculate_bbox(polygon)
+            since_epoch = int(time.time()) - since_minutes * 60
+            polygon_filter, polygon_params = self._polygon_query_part(polygon)
+            source = self._dedup_source('css.ais_current', 'mmsi', 'ts')
             
             query = f"""
                 SELECT 
@@ -146,61 +180,71 @@ class MatchingController:
                     toFloat64(heading) as heading,
                     ts,
                     received_at
-                FROM css.ais_current FINAL
-                WHERE ts > parseDateTimeBestEffort('{since.isoformat()}')
-                  AND lat BETWEEN {bbox['min_lat']} AND {bbox['max_lat']}
-                  AND lng BETWEEN {bbox['min_lon']} AND {bbox['max_lon']}
+                FROM {source}
+                WHERE ts > toDateTime({{since:UInt32}})
+                  AND lat BETWEEN {{min_lat:Float64}} AND {{max_lat:Float64}}
+                  AND lng BETWEEN {{min_lon:Float64}} AND {{max_lon:Float64}}
+                  {polygon_filter}
                 ORDER BY ts DESC
-                LIMIT {limit}
+                LIMIT {{limit:UInt32}}
             """
             
-            result = clickhouse_service.execute_query(query)
+            params = {
+                'since': since_epoch,
+                'min_lat': bbox['min_lat'],
+                'max_lat': bbox['max_lat'],
+                'min_lon': bbox['min_lon'],
+                'max_lon': bbox['max_lon'],
+                'limit': limit,
+                **polygon_params
+            }
+            
+            result = await clickhouse_service.execute_query(query, params, columnar=True)
             
-            if not result:
+            if not result or not result['mmsi']:
                 return []
             
+            lat = self._float_values(result['lat'])
+            lon = self._float_values(result['lon'])
+            rows = self._valid_rows(lat, lon)
+            lat = lat.tolist()
+            lon = lon.tolist()
+            sog = self._float_values(result['sog']).tolist()
+            cog = self._float_values(result['cog']).tolist()
+            heading = self._float_values(result['heading']).tolist()
+            mmsi = result['mmsi']
+            ship_name = result['ship_name']
+            ts = result['ts']
+            received_at = result['received_at']
+            
             # Convert to list of dicts
-            ais_data = []
-            for row in result:
-                try:
-                    lat = float(row.get('lat') or 0.0)
-                    lon = float(row.get('lon') or 0.0)
-                    
-                    # Skip if no valid coordinates
-                    if lat == 0.0 and lon == 0.0:
-                        continue
-                    
-                    # Apply polygon filter if provided
-                    if polygon and not self._point_in_polygon(lon, lat, polygon):
-                        continue
-                    
-                    ais_data.append({
-                        'mmsi': str(row.get('mmsi', '')),
-                        'ship_name': row.get('ship_name', ''),
-                        'lat': lat,
-                        'lon': lon,
-                        'sog': float(row.get('sog') or 0.0),
-                        'cog': float(row.get('cog') or 0.0),
-                        'heading': float(row.get('heading') or 0.0),
-                        'ts': row.get('ts'),
-                        'received_at': row.get('received_at')
-                    })
-                except (ValueError, TypeError) as e:
-                    # Skip invalid records
-                    print(f"  ⚠️ Skipping AIS record with invalid data: {e}")
-                    continue
+            ais_data = [
+                {
+                    'mmsi': str(mmsi[i]),
+                    'ship_name': ship_name[i],
+                    'lat': lat[i],
+                    'lon': lon[i],
+                    'sog': sog[i],
+                    'cog': cog[i],
+                    'heading': heading[i],
+                    'ts': ts[i],
+                    'received_at': received_at[i]
+                }
+                for i in rows
+            ]
             
             return ais_data
             
         except Exception as e:
-            print(f"❌ Error fetching AIS data: {e}")
+            logger.error("❌ Error fetching AIS data: %s", e)
             return []
     
     async def fetch_arpa_data(
         self,
         since_minutes: int = 60,
         limit: int = 1000,
-        polygon: Optional[List[List[List[float]]]] = None
+        polygon: Optional[List[List[List[float]]]] = None,
+        bbox: Optional[Dict[str, float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Fetch ARPA data from ClickHouse.
@@ -209,13 +253,17 @@ class MatchingController:
             since_minutes: Fetch data from last N minutes
             limit: Maximum number of records
             polygon: Optional GeoJSON polygon for spatial filter
+            bbox: Precomputed bounding box (calculated from polygon if omitted)
             
         Returns:
             List of ARPA records
         """
         try:
-            bbox = self._calculate_bbox(polygon)
-            since = datetime.utcnow() - timedelta(minutes=since_minutes)
+            if bbox is None:
+                bbox = self._calculate_bbox(polygon)
+            since_epoch = int(time.time()) - since_minutes * 60
+            polygon_filter, polygon_params = self._polygon_query_part(polygon)
+            source = self._dedup_source('css.arpa_current', 'target', 'recv_at')
             
             query = f"""
                 SELECT 
@@ -228,64 +276,79 @@ class MatchingController:
                     toFloat64(bearing) as bearing,
                     recv_at,
                     received_at
-                FROM css.arpa_current FINAL
-                WHERE recv_at > parseDateTimeBestEffort('{since.isoformat()}')
-                  AND lat BETWEEN {bbox['min_lat']} AND {bbox['max_lat']}
-                  AND lng BETWEEN {bbox['min_lon']} AND {bbox['max_lon']}
+                FROM {source}
+                WHERE recv_at > toDateTime({{since:UInt32}})
+                  AND lat BETWEEN {{min_lat:Float64}} AND {{max_lat:Float64}}
+                  AND lng BETWEEN {{min_lon:Float64}} AND {{max_lon:Float64}}
+                  {polygon_filter}
                 ORDER BY recv_at DESC
-                LIMIT {limit}
+                LIMIT {{limit:UInt32}}
             """
             
-            result = clickhouse_service.execute_query(query)
+            params = {
+                'since': since_epoch,
+                'min_lat': bbox['min_lat'],
+                'max_lat': bbox['max_lat'],
+                'min_lon': bbox['min_lon'],
+                'max_lon': bbox['max_lon'],
+                'limit': limit,
+                **polygon_params
+            }
+            
+            result = await clickhouse_service.execute_query(query, params, columnar=True)
             
-            if not result:
+            if not result or not result['target']:
                 return []
             
+            lat = self._float_values(result['lat'])
+            lon = self._float_values(result['lon'])
+            rows = self._valid_rows(lat, lon)
+            lat = lat.tolist()
+            lon = lon.tolist()
+            speed = self._float_values(result['speed']).tolist()
+            course = self._float_values(result['course']).tolist()
+            target = result['target']
+            distance_nm = result['distance_nm']  # Optional, NULL stays None
+            bearing = result['bearing']  # Optional, NULL stays None
+            recv_at = result['recv_at']
+            received_at = result['received_at']
+            
             # Convert to list of dicts
-            arpa_data = []
-            for row in result:
-                try:
-                    lat = float(row.get('lat') or 0.0)
-                    lon = float(row.get('lon') or 0.0)
-                    
-                    # Skip if no valid coordinates
-                    if lat == 0.0 and lon == 0.0:
-                        continue
-                    
-                    # Apply polygon filter if provided
-                    if polygon and not self._point_in_polygon(lon, lat, polygon):
-                        continue
-                    
-                    # Handle optional distance_nm
-                    distance_nm = row.get('distance_nm')
-                    distance_nm_value = float(distance_nm) if distance_nm is not None else None
-                    
-                    # Handle optional bearing
-                    bearing = row.get('bearing')
-                    bearing_value = float(bearing) if bearing is not None else None
-                    
-                    arpa_data.append({
-                        'target': str(row.get('target', '')),
-                        'lat': lat,
-                        'lon': lon,
-                        'speed': float(row.get('speed') or 0.0),
-                        'course': float(row.get('course') or 0.0),
-                        'distance_nm': distance_nm_value,
-                        'bearing': bearing_value,
-                        'recv_at': row.get('recv_at'),
-                        'received_at': row.get('received_at')
-                    })
-                except (ValueError, TypeError) as e:
-                    # Skip invalid records
-                    print(f"  ⚠️ Skipping ARPA record with invalid data: {e}")
-                    continue
+            arpa_data = [
+                {
+                    'target': str(target[i]),
+                    'lat': lat[i],
+                    'lon': lon[i],
+                    'speed': speed[i],
+                    'course': course[i],
+                    'distance_nm': distance_nm[i],
+                    'bearing': bearing[i],
+                    'recv_at': recv_at[i],
+                    'received_at': received_at[i]
+                }
+                for i in rows
+            ]
             
             return arpa_data
             
         except Exception as e:
-            print(f"❌ Error fetching ARPA data: {e}")
+            logger.error("❌ Error fetching ARPA data: %s", e)
             return []
     
+    @staticmethod
+    def _record_columns(records: List[Dict]) -> Dict[str, list]:
+        """Transpose uniform records into a dict of column lists."""
+        return {key: [r.get(key) for r in records] for key in records[0]}
+    
+    @staticmethod
+    def _float_column(records: List[Dict], key: str) -> np.ndarray:
+        """Extract one record field as a float array, None becoming NaN."""
+        return np.fromiter(
+            (np.nan if r.get(key) is None else r[key] for r in records),
+            dtype=np.float64,
+            count=len(records)
+        )
+    
     def _prepare_dataframes(
         self,
         ais_data: List[Dict],
@@ -301,79 +364,64 @@ class MatchingController:
         Returns:
             Tuple of (ais_df, arpa_df)
         """
-        # Build AIS DataFrame
-        ais_df = pd.DataFrame(ais_data)
+        # Build AIS DataFrame from whole columns
+        ais_df = pd.DataFrame()
         
-        if not ais_df.empty:
+        if ais_data:
+            cols = self._record_columns(ais_data)
+            lat = self._float_column(ais_data, 'lat')
+            lon = self._float_column(ais_data, 'lon')
+            heading = self._float_column(ais_data, 'heading')
+            cog = self._float_column(ais_data, 'cog')
+            
             # Add IDs
-            ais_df['ais_id'] = ais_df['mmsi']
-            
-            # Convert to XY (row by row)
-            xy_results = []
-            for _, row in ais_df.iterrows():
-                x, y = to_xy(
-                    row['lat'],
-                    row['lon'],
-                    self.site_lat,
-                    self.site_lon,
-                    self.transformer
-                )
-                xy_results.append((x, y))
-            
-            ais_df['x'] = [r[0] for r in xy_results]
-            ais_df['y'] = [r[1] for r in xy_results]
+            cols['ais_id'] = cols['mmsi']
+            
+            # Convert to XY (whole columns at once)
+            cols['x'], cols['y'] = to_xy_array(lat, lon, self.site_lat, self.site_lon, self.transformer)
             
             # Convert speeds (matching.py expects 'sog_ms')
-            ais_df['sog_ms'] = ais_df['sog'].apply(knots_to_mps)
+            cols['sog_ms'] = knots_to_mps_array(self._float_column(ais_data, 'sog'))
             
             # Use heading if available, otherwise cog (matching.py expects 'cog_deg')
-            ais_df['cog_deg'] = ais_df.apply(
-                lambda row: row['heading'] if pd.notna(row['heading']) and row['heading'] != 0 else row['cog'],
-                axis=1
-            )
+            cols['cog_deg'] = np.where(~np.isnan(heading) & (heading != 0), heading, cog)
             
             # Convert timestamps (matching.py expects 'timestamp_s')
-            ais_df['timestamp_s'] = ais_df['ts'].apply(parse_time_s)
+            cols['timestamp_s'] = parse_time_s_array(cols['ts'])
+            
+            ais_df = pd.DataFrame(cols)
         
-        # Build ARPA DataFrame
-        arpa_df = pd.DataFrame(arpa_data)
+        # Build ARPA DataFrame from whole columns
+        arpa_df = pd.DataFrame()
         
-        if not arpa_df.empty:
+        if arpa_data:
+            cols = self._record_columns(arpa_data)
+            lat = self._float_column(arpa_data, 'lat')
+            lon = self._float_column(arpa_data, 'lon')
+            
             # Add IDs
-            arpa_df['arpa_id'] = arpa_df['target']
-            
-            # Convert to XY (row by row)
-            xy_results = []
-            for _, row in arpa_df.iterrows():
-                x, y = to_xy(
-                    row['lat'],
-                    row['lon'],
-                    self.site_lat,
-                    self.site_lon,
-                    self.transformer
-                )
-                xy_results.append((x, y))
-            
-            arpa_df['x'] = [r[0] for r in xy_results]
-            arpa_df['y'] = [r[1] for r in xy_results]
+            cols['arpa_id'] = cols['target']
+            
+            # Convert to XY (whole columns at once)
+            cols['x'], cols['y'] = to_xy_array(lat, lon, self.site_lat, self.site_lon, self.transformer)
             
             # Convert speeds (matching.py expects 'speed_ms')
-            arpa_df['speed_ms'] = arpa_df['speed'].apply(knots_to_mps)
+            cols['speed_ms'] = knots_to_mps_array(self._float_column(arpa_data, 'speed'))
             
             # Use course as heading (matching.py expects 'heading_deg')
-            arpa_df['heading_deg'] = arpa_df['course']
+            cols['heading_deg'] = cols['course']
             
             # Convert timestamps (matching.py expects 'timestamp_s')
-            arpa_df['timestamp_s'] = arpa_df['recv_at'].apply(parse_time_s)
+            cols['timestamp_s'] = parse_time_s_array(cols['recv_at'])
             
             # Add range/bearing measurements if available
-            if 'distance_nm' in arpa_df.columns:
-                arpa_df['r_meas_m'] = arpa_df['distance_nm'].apply(
-                    lambda x: x * 1852.0 if pd.notna(x) else np.nan
-                )
+            if 'distance_nm' in cols:
+                cols['r_meas_m'] = self._float_column(arpa_data, 'distance_nm') * 1852.0
+            
+            if 'bearing' in cols:
+                cols['brg_meas_deg'] = cols['bearing']
             
-            if 'bearing' in arpa_df.columns:
-                arpa_df['brg_meas_deg'] = arpa_df['bearing']
+            arpa_df = pd.DataFrame(cols)
         
         return ais_df, arpa_df
     
@@ -397,19 +445,22 @@ class MatchingController:
             Dict with matching results
         """
         try:
-            start_time = datetime.utcnow()
+            start_time = time.perf_counter()
             
             # Fetch data
             if polygon:
-                print(f"📊 Fetching data within polygon (last {since_minutes} minutes)...")
+                logger.info("📊 Fetching data within polygon (last %s minutes)...", since_minutes)
             else:
-                print(f"📊 Fetching data (last {since_minutes} minutes)...")
+                logger.info("📊 Fetching data (last %s minutes)...", since_minutes)
             
-            ais_data = await self.fetch_ais_data(since_minutes, ais_limit, polygon)
-            arpa_data = await self.fetch_arpa_data(since_minutes, arpa_limit, polygon)
+            bbox = self._calculate_bbox(polygon)
+            ais_data, arpa_data = await asyncio.gather(
+                self.fetch_ais_data(since_minutes, ais_limit, polygon, bbox),
+                self.fetch_arpa_data(since_minutes, arpa_limit, polygon, bbox)
+            )
             
-            print(f"  AIS: {len(ais_data)} records")
-            print(f"  ARPA: {len(arpa_data)} records")
+            logger.info("  AIS: %s records", len(ais_data))
+            logger.info("  ARPA: %s records", len(arpa_data))
             
             if not ais_data or not arpa_data:
                 return {
@@ -427,15 +478,15 @@ class MatchingController:
                             "unmatched_arpa": len(arpa_data)
                         }
                     },
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": datetime.now(timezone.utc).isoformat()
                 }
             
             # Prepare DataFrames
-            print("🔄 Preparing data for matching...")
+            logger.info("🔄 Preparing data for matching...")
             ais_df, arpa_df = self._prepare_dataframes(ais_data, arpa_data)
             
             # Build candidates
-            print("🔍 Building candidates...")
+            logger.info("🔍 Building candidates...")
             candidates = build_candidates(
                 ais_df,
                 arpa_df,
@@ -444,13 +495,13 @@ class MatchingController:
                 scoring_params=self.scoring_params
             )
             
-            print(f"  {len(candidates)} candidates generated")
+            logger.info("  %s candidates generated", len(candidates))
             
             # Handle case when no candidates
             if len(candidates) == 0:
-                print("  ⚠️ No candidates passed gating criteria")
-                print(f"     Gating distance: {self.gating_distance_m}m")
-                print(f"     Time gate: {self.time_gate_s}s")
+                logger.warning("  ⚠️ No candidates passed gating criteria")
+                logger.info("     Gating distance: %sm", self.gating_distance_m)
+                logger.info("     Time gate: %ss", self.time_gate_s)
                 
                 return {
                     "success": True,
@@ -474,14 +525,14 @@ class MatchingController:
                           "match_threshold": self.match_threshold,
                           "filter_radius_km": self.filter_radius_km,
                           "polygon_provided": polygon is not None,
-                          "bbox": self._calculate_bbox(polygon)
+                          "bbox": bbox
                       }
                     },
-                    "timestamp": datetime.utcnow().isoformat()
+                    "timestamp": datetime.now(timezone.utc).isoformat()
                 }
             
             # Assign matches
-            print("🎯 Assigning optimal matches...")
+            logger.info("🎯 Assigning optimal matches...")
             matches, unmatched_arpa_ids = assign_one_to_one(
                 candidates,
                 arpa_df,
@@ -492,11 +543,11 @@ class MatchingController:
             # Calculate unmatched AIS IDs
             matched_ais_ids = {m['ais_id'] for m in matches}
             all_ais_ids = set(ais_df['ais_id'].tolist())
-            unmatched_ais_ids = list(all_ais_ids - matched_ais_ids)
+            unmatched_ais_ids = all_ais_ids - matched_ais_ids
             
-            print(f"  ✓ {len(matches)} matched pairs")
-            print(f"  ✓ {len(unmatched_arpa_ids)} unmatched ARPA")
-            print(f"  ✓ {len(unmatched_ais_ids)} unmatched AIS")
+            logger.info("  ✓ %s matched pairs", len(matches))
+            logger.info("  ✓ %s unmatched ARPA", len(unmatched_arpa_ids))
+            logger.info("  ✓ %s unmatched AIS", len(unmatched_ais_ids))
             
             # Build candidate lookup for detailed features
             candidate_lookup = {}
@@ -504,6 +555,15 @@ class MatchingController:
                 key = (c['arpa_id'], c['ais_id'])
                 candidate_lookup[key] = c
             
+            # Index original records by id (first occurrence wins); ids are
+            # already strings from the fetchers
+            ais_by_mmsi = {}
+            for r in ais_data:
+                ais_by_mmsi.setdefault(r['mmsi'], r)
+            arpa_by_target = {}
+            for r in arpa_data:
+                arpa_by_target.setdefault(r['target'], r)
+            
             # Build response
             matched_pairs = []
             for match in matches:
@@ -511,8 +571,8 @@ class MatchingController:
                 ais_id = match['ais_id']
                 
                 # Get original records
-                ais_record = next((r for r in ais_data if str(r['mmsi']) == str(ais_id)), None)
-                arpa_record = next((r for r in arpa_data if str(r['target']) == str(arpa_id)), None)
+                ais_record = ais_by_mmsi.get(ais_id)
+                arpa_record = arpa_by_target.get(arpa_id)
                 
                 # Look up detailed candidate features
                 candidate = candidate_lookup.get((arpa_id, ais_id), {})
@@ -542,15 +602,17 @@ class MatchingController:
                 })
             
             # Get unmatched records
+            unmatched_arpa_id_set = set(unmatched_arpa_ids)
+            
             unmatched_ais = [
-                r for r in ais_data if str(r['mmsi']) in unmatched_ais_ids
+                r for r in ais_data if r['mmsi'] in unmatched_ais_ids
             ]
             
             unmatched_arpa = [
-                r for r in arpa_data if str(r['target']) in unmatched_arpa_ids
+                r for r in arpa_data if r['target'] in unmatched_arpa_id_set
             ]
             
-            elapsed_time = (datetime.utcnow() - start_time).total_seconds()
+            elapsed_time = time.perf_counter() - start_time
             
             geojson = self.build_geojson(matched_pairs)
             
@@ -578,80 +640,74 @@ class MatchingController:
                         "match_threshold": self.match_threshold,
                         "filter_radius_km": self.filter_radius_km,
                         "polygon_provided": polygon is not None,
-                        "bbox": self._calculate_bbox(polygon)
+                        "bbox": bbox
                     },
                     "geojson": geojson
                 },
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
-            print(f"❌ Error in matching process: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error in matching process: %s", e)
             
             return {
                 "success": False,
                 "message": f"Matching failed: {str(e)}",
                 "data": None,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
     
     def build_geojson(self, matched_pairs):
         features = []
+        append = features.append
         for match in matched_pairs:
             ais = match.get("ais", {})
             arpa = match.get("arpa", {})
             score = match.get("score", 0)
             distance_m = match.get("distance_m", 0)
+            mmsi = ais.get("mmsi")
+            ship_name = ais.get("ship_name")
+            target = arpa.get("target")
+
+            # Coordinates are shared by the points and the connecting line
+            ais_coords = [ais.get("lon"), ais.get("lat")]
+            arpa_coords = [arpa.get("lon"), arpa.get("lat")]
 
             # AIS Point
-            features.append({
+            append({
                 "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [ais.get("lon"), ais.get("lat")]
-                },
+                "geometry": {"type": "Point", "coordinates": ais_coords},
                 "properties": {
                     "type": "ais",
-                    "mmsi": ais.get("mmsi"),
-                    "ship_name": ais.get("ship_name"),
+                    "mmsi": mmsi,
+                    "ship_name": ship_name,
                     "score": score
                 }
             })
 
             # ARPA Point
-            features.append({
+            append({
                 "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [arpa.get("lon"), arpa.get("lat")]
-                },
+                "geometry": {"type": "Point", "coordinates": arpa_coords},
                 "properties": {
                     "type": "arpa",
-                    "target": arpa.get("target"),
+                    "target": target,
                     "score": score
                 }
             })
 
             # LineString connecting AIS and ARPA
-            features.append({
+            append({
                 "type": "Feature",
-                "geometry": {
-                    "type": "LineString",
-                    "coordinates": [
-                        [ais.get("lon"), ais.get("lat")],
-                        [arpa.get("lon"), arpa.get("lat")]
-                    ]
-                },
+                "geometry": {"type": "LineString", "coordinates": [ais_coords, arpa_coords]},
                 "properties": {
                     "type": "match",
-                    "ais_id": ais.get("mmsi"),
-                    "arpa_id": arpa.get("target"),
+                    "ais_id": mmsi,
+                    "arpa_id": target,
                     "score": score,
                     "distance_m": distance_m,
-                    "ship_name": ais.get("ship_name"),
-                    "target": arpa.get("target")
+                    "ship_name": ship_name,
+                    "target": target
                 }
             })
 
@@ -1,7 +1,7 @@
 """Application configuration."""
 
-import os
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
@@ -9,66 +9,90 @@ load_dotenv()
 
 
 class Settings(BaseSettings):
-    """Application settings."""
+    """Application settings (values are read from the environment / .env by field name)."""
     
     # Application
     APP_NAME: str = "Projection BPP Listener"
     APP_VERSION: str = "1.0.0"
-    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
+    DEBUG: bool = False
     
     # Server
-    HOST: str = os.getenv("HOST", "0.0.0.0")
-    PORT: int = int(os.getenv("PORT", "8000"))
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    CORS_ORIGINS: List[str] = ["*"]
     
     # ClickHouse
-    CLICKHOUSE_HOST: str = os.getenv("CLICKHOUSE_HOST", "localhost")
-    CLICKHOUSE_PORT: int = int(os.getenv("CLICKHOUSE_PORT", "9000"))
-    CLICKHOUSE_DATABASE: str = os.getenv("CLICKHOUSE_DATABASE", "default")
-    CLICKHOUSE_USER: str = os.getenv("CLICKHOUSE_USER", "default")
-    CLICKHOUSE_PASSWORD: str = os.getenv("CLICKHOUSE_PASSWORD", "")
+    CLICKHOUSE_HOST: str = "localhost"
+    CLICKHOUSE_PORT: int = 9000
+    CLICKHOUSE_DATABASE: str = "default"
+    CLICKHOUSE_USER: str = "default"
+    CLICKHOUSE_PASSWORD: str = ""
+    CLICKHOUSE_POOL_MIN: int = 1
+    CLICKHOUSE_POOL_MAX: int = 10
+    CLICKHOUSE_COMPRESSION: str = "lz4"
+    CLICKHOUSE_MAX_THREADS: int = 4
+    USE_FINAL: bool = False
     
     # Redis
-    REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
-    REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))
-    REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
-    REDIS_PASSWORD: str = os.getenv("REDIS_PASSWORD", "")
-    REDIS_TTL: int = int(os.getenv("REDIS_TTL", "3600"))
-    REDIS_PREFIX: str = os.getenv("REDIS_PREFIX", "projection_bpp_cache_")
+    REDIS_HOST: str = "localhost"
+    REDIS_PORT: int = 6379
+    REDIS_DB: int = 0
+    REDIS_PASSWORD: str = ""
+    REDIS_TTL: int = 3600
+    REDIS_PREFIX: str = "projection_bpp_cache_"
     
     # WebSocket
-    WEBSOCKET_URL: str = os.getenv("WEBSOCKET_URL", "ws://202.10.32.106:1880/ws/projection_bpp")
-    WEBSOCKET_RECONNECT_DELAY: int = int(os.getenv("WEBSOCKET_RECONNECT_DELAY", "5"))
-    WEBSOCKET_AUTO_START: bool = os.getenv("WEBSOCKET_AUTO_START", "True").lower() == "true"
+    WEBSOCKET_URL: str = "ws://202.10.32.106:1880/ws/projection_bpp"
+    WEBSOCKET_RECONNECT_DELAY: int = 5
+    WEBSOCKET_AUTO_START: bool = True
+    WEBSOCKET_CLIENT_QUEUE_SIZE: int = 64
+    WEBSOCKET_MAX_CONCURRENT_MESSAGES: int = 4
     
     # Polling System Configuration
-    ENABLE_POLLING: bool = os.getenv("ENABLE_POLLING", "True").lower() == "true"
-    POLL_INTERVAL_S: float = float(os.getenv("POLL_INTERVAL_S", "1.0"))
-    BOOTSTRAP_MINUTES: int = int(os.getenv("BOOTSTRAP_MINUTES", "60"))
-    CACHE_TTL_S: int = int(os.getenv("CACHE_TTL_S", "3600"))
+    ENABLE_POLLING: bool = True
+    POLL_INTERVAL_S: float = 1.0
+    BOOTSTRAP_MINUTES: int = 60
+    CACHE_TTL_S: int = 3600
     
     # Site Location (for bbox calculation)
-    SITE_LAT: float = float(os.getenv("SITE_LAT", "-1.279656"))
-    SITE_LON: float = float(os.getenv("SITE_LON", "116.809655"))
-    FILTER_RADIUS_KM: float = float(os.getenv("FILTER_RADIUS_KM", "60.0"))
+    SITE_LAT: float = -1.279656
+    SITE_LON: float = 116.809655
+    FILTER_RADIUS_KM: float = 60.0
     
     # Projection
-    PROJECTION: str = os.getenv("PROJECTION", "EPSG:32650")
+    PROJECTION: str = "EPSG:32650"
     
     # Matching Parameters
-    GATING_DISTANCE_M: float = float(os.getenv("GATING_DISTANCE_M", "8000.0"))
-    TIME_GATE_S: float = float(os.getenv("TIME_GATE_S", "1800.0"))
-    MATCH_THRESHOLD: float = float(os.getenv("MATCH_THRESHOLD", "0.6"))
+    GATING_DISTANCE_M: float = 8000.0
+    TIME_GATE_S: float = 1800.0
+    MATCH_THRESHOLD: float = 0.6
     
     # Scoring Parameters
-    POS_SIGMA_M: float = float(os.getenv("POS_SIGMA_M", "500.0"))
-    SPD_SIGMA_MS: float = float(os.getenv("SPD_SIGMA_MS", "3.0"))
-    HDG_SIGMA_DEG: float = float(os.getenv("HDG_SIGMA_DEG", "40.0"))
-    TIME_SIGMA_S: float = float(os.getenv("TIME_SIGMA_S", "60.0"))
+    POS_SIGMA_M: float = 500.0
+    SPD_SIGMA_MS: float = 3.0
+    HDG_SIGMA_DEG: float = 40.0
+    TIME_SIGMA_S: float = 60.0
+    RANGE_SIGMA_M: float = 1500.0
+    BEARING_GEO_SIGMA_DEG: float = 15.0
+    W_RANGE: float = 0.15
+    W_BRG_GEO: float = 0.15
     
     class Config:
         """Pydantic config."""
         case_sensitive = True
         env_file = ".env"
+        frozen = True  # Read-only after startup
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings, loading them on first use.
+    
+    Returns:
+        Shared Settings instance
+    """
+    return Settings()
+
+
+settings = get_settings()
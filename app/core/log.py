@@ -0,0 +1,55 @@
+"""Application logging."""
+
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import settings
+
+_queue: queue.SimpleQueue = queue.SimpleQueue()
+_handler = logging.StreamHandler(sys.stdout)
+_handler.setFormatter(logging.Formatter("%(message)s"))
+_listener = QueueListener(_queue, _handler)
+_running = False
+
+
+def setup_logging() -> None:
+    """
+    Route the "app" logger through a queue.
+    
+    Records are handed to a background thread that writes them to stdout,
+    so logging never blocks the event loop on a console write.
+    """
+    global _running
+    app_logger = logging.getLogger("app")
+    if not app_logger.handlers:
+        app_logger.addHandler(QueueHandler(_queue))
+        app_logger.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+        app_logger.propagate = False
+    
+    if not _running:
+        _listener.start()
+        _running = True
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _running
+    if _running:
+        _listener.stop()
+        _running = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger below the "app" hierarchy.
+    
+    Args:
+        name: Module name (usually __name__)
+    
+    Returns:
+        Logger writing through the queue
+    """
+    setup_logging()
+    return logging.getLogger(name)
@@ -4,10 +4,17 @@ import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.core.config import settings
-from app.api.routes import router
+from app.core.log import get_logger, setup_logging, stop_logging
+from app.api.routes import router, report_ws_connections
 from app.services.websocket import websocket_listener
+from app.services.clickhouse import clickhouse_service
+from app.services.cache import monitor_redis
+
+logger = get_logger(__name__)
 
 
 @asynccontextmanager
@@ -19,23 +26,40 @@ async def lifespan(app: FastAPI):
         app: FastAPI application instance
     """
     # Startup
-    print(f"🚀 Starting {settings.APP_NAME} v{settings.APP_VERSION}")
-    print(f"📡 Connecting to WebSocket: {settings.WEBSOCKET_URL}")
+    setup_logging()
+    logger.info("🚀 Starting %s v%s", settings.APP_NAME, settings.APP_VERSION)
+    logger.info("📡 Connecting to WebSocket: %s", settings.WEBSOCKET_URL)
+    
+    # Warm up the ClickHouse client pool (queries retry lazily if this fails)
+    try:
+        await clickhouse_service.pool.open()
+    except Exception as e:
+        logger.warning("⚠️ ClickHouse pool warm-up failed: %s", e)
     
     # Start WebSocket listener in background
     listener_task = asyncio.create_task(websocket_listener.listen())
     
+    # Report WebSocket client churn in aggregate
+    ws_report_task = asyncio.create_task(report_ws_connections())
+    
+    # Ping Redis in the background instead of before every cache operation
+    redis_monitor_task = asyncio.create_task(monitor_redis())
+    
     yield
     
     # Shutdown
-    print("🛑 Shutting down...")
+    logger.info("🛑 Shutting down...")
     websocket_listener.stop()
+    ws_report_task.cancel()
+    redis_monitor_task.cancel()
     listener_task.cancel()
     try:
         await listener_task
     except asyncio.CancelledError:
         pass
-    print("✓ Shutdown complete")
+    clickhouse_service.close()
+    logger.info("✓ Shutdown complete")
+    stop_logging()
 
 
 def create_app() -> FastAPI:
@@ -49,18 +73,22 @@ def create_app() -> FastAPI:
         title=settings.APP_NAME,
         version=settings.APP_VERSION,
         description="FastAPI service that listens to WebSocket and queries ClickHouse",
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
     
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=["*"],
-        allow_credentials=True,
-        allow_methods=["*"],
-        allow_headers=["*"],
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=False,
+        allow_methods=["GET", "POST"],
+        allow_headers=["Content-Type"],
     )
     
+    # Compress larger responses (dashboard HTML, cache listings)
+    app.add_middleware(GZipMiddleware, minimum_size=500)
+    
     # Include routers
     app.include_router(router, tags=["main"])
     
@@ -1,6 +1,6 @@
 """Pydantic schemas for request/response models."""
 
-from typing import Any, List, Optional, Dict
+from typing import Any, List, Optional, Dict, Tuple
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -31,11 +31,6 @@ class MessageData(BaseModel):
     timestamp: datetime
     received_data: dict
     query_result: Optional[List[Any]] = None
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 class CacheStats(BaseModel):
@@ -55,16 +50,11 @@ class CachedItem(BaseModel):
     timestamp: datetime
     data: Any
     metadata: Dict = Field(default_factory=dict)
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 class MatchingRequest(BaseModel):
     """Request model for AIS-ARPA matching with polygon filter."""
-    polygon: List[List[List[float]]] = Field(
+    polygon: List[List[Tuple[float, float]]] = Field(
         ..., 
         description="GeoJSON polygon coordinates [[[lon, lat], ...]]"
     )
@@ -1,12 +1,35 @@
 """Caching service for WebSocket data using Redis."""
 
+import asyncio
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 from collections import deque
+from itertools import islice
+import bisect
 import threading
-import json
+import orjson
 import redis
 from app.core.config import settings
+from app.core.log import get_logger
+
+logger = get_logger(__name__)
+
+# Add one item in a single round-trip: take the next seq, splice it into the
+# encoded member, insert into both sorted sets, trim them and refresh expiry.
+# KEYS: seq counter, messages by time, messages by seq
+# ARGV: member before seq, member after seq, time score, max size, TTL seconds
+_ADD_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local member = ARGV[1] .. seq .. ARGV[2]
+local keep = -tonumber(ARGV[4]) - 1
+redis.call('ZADD', KEYS[2], ARGV[3], member)
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, keep)
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+redis.call('ZADD', KEYS[3], seq, member)
+redis.call('ZREMRANGEBYRANK', KEYS[3], 0, keep)
+redis.call('EXPIRE', KEYS[3], ARGV[5])
+return seq
+"""
 
 
 class DataCache:
@@ -27,14 +50,20 @@ class DataCache:
         # Redis configuration
         self._redis_prefix = settings.REDIS_PREFIX
         self._redis_key = f"{self._redis_prefix}websocket:messages"
+        self._redis_seq_key = f"{self._redis_prefix}websocket:seq"
+        self._redis_seq_index_key = f"{self._redis_prefix}websocket:messages_by_seq"
         
         # Redis client
         self._redis_client: Optional[redis.Redis] = None
+        self._add_script = None
         self._redis_available = False
         
         # Fallback in-memory cache (only used if Redis is unavailable)
         self._fallback_cache: deque = deque(maxlen=max_size)
         
+        # Item timestamps in insertion (time) order, parallel to the fallback cache
+        self._fallback_ts: deque = deque(maxlen=max_size)
+        
         # Statistics
         self._stats = {
             "total_messages": 0,
@@ -45,6 +74,14 @@ class DataCache:
         }
         self._lock = threading.Lock()
         
+        # Bumped on every mutation so readers can reuse derived data
+        self._version = 0
+        
+        # Highest sequence number issued or seen. Items cached in memory continue
+        # from it, and the Redis counter is raised to it on reconnect, so
+        # cursors never go backwards across a failover.
+        self._seq = 0
+        
         # Initialize Redis connection
         self._init_redis()
     
@@ -56,45 +93,55 @@ class DataCache:
             data: Data to cache
             metadata: Optional metadata about the data
         """
-        with self._lock:
-            timestamp = datetime.now()
-            cache_item = {
-                "timestamp": timestamp.isoformat(),
-                "data": data,
-                "metadata": metadata or {}
-            }
-            
-            # Try Redis first
-            if self._check_redis():
-                try:
-                    # Use sorted set with timestamp as score for time-based queries
-                    score = timestamp.timestamp()
-                    member = json.dumps(cache_item)
-                    
-                    # Add to Redis sorted set with prefix
-                    self._redis_client.zadd(self._redis_key, {member: score})
-                    
-                    # Trim to max size (keep most recent)
-                    count = self._redis_client.zcard(self._redis_key)
-                    if count > self.max_size:
-                        remove_count = count - self.max_size
-                        self._redis_client.zremrangebyrank(self._redis_key, 0, remove_count - 1)
-                    
-                    # Set expiration on the entire key
-                    self._redis_client.expire(self._redis_key, self.ttl_seconds)
-                    
+        timestamp = datetime.now()
+        cache_item = {
+            "timestamp": timestamp.isoformat(),
+            "data": data,
+            "metadata": metadata or {}
+        }
+        
+        # Try Redis first
+        if self._check_redis():
+            try:
+                # Members end with the monotonic seq the script assigns, so
+                # clients can poll for new items only
+                encoded = orjson.dumps(cache_item, default=str, option=orjson.OPT_NON_STR_KEYS)
+                cache_item["seq"] = int(self._add_script(
+                    keys=[self._redis_seq_key, self._redis_key, self._redis_seq_index_key],
+                    args=[
+                        encoded[:-1] + b',"seq":',
+                        b"}",
+                        timestamp.timestamp(),
+                        self.max_size,
+                        self.ttl_seconds
+                    ]
+                ))
+                
+                with self._lock:
+                    self._seq = max(self._seq, cache_item["seq"])
                     self._stats["total_messages"] += 1
                     self._stats["last_updated"] = timestamp
-                    return
-                except Exception as e:
-                    print(f"⚠️ Redis add failed, falling back to memory: {e}")
-                    self._redis_available = False
-            
-            # Fallback to in-memory cache
+                    self._version += 1
+                return
+            except Exception as e:
+                logger.warning("⚠️ Redis add failed, falling back to memory: %s", e)
+                self._handle_redis_error(e)
+        
+        # Fallback to in-memory cache
+        with self._lock:
+            self._seq += 1
+            cache_item["seq"] = self._seq
             cache_item["timestamp"] = timestamp  # Keep datetime object for in-memory
             self._fallback_cache.append(cache_item)
+            self._fallback_ts.append(timestamp)
             self._stats["total_messages"] += 1
             self._stats["last_updated"] = timestamp
+            self._version += 1
+    
+    @property
+    def version(self) -> int:
+        """Monotonic counter incremented whenever cached content changes."""
+        return self._version
     
     def get_recent(self, limit: int = 100) -> List[Dict]:
         """
@@ -102,51 +149,117 @@ class DataCache:
         
         Args:
             limit: Maximum number of items to return
-            
+        
         Returns:
             List of recent cache items with serialized timestamps
         """
+        # Try Redis first
+        if self._check_redis():
+            try:
+                # Get most recent non-expired items (score is the timestamp)
+                cutoff_score = (datetime.now() - self.ttl).timestamp()
+                items = self._redis_client.zrevrangebyscore(
+                    self._redis_key,
+                    "+inf",
+                    cutoff_score,
+                    start=0,
+                    num=limit
+                )
+                
+                result = []
+                for item in items:
+                    try:
+                        result.append(orjson.loads(item))
+                    except Exception as e:
+                        logger.warning("⚠️ Error parsing cache item: %s", e)
+                        continue
+                
+                with self._lock:
+                    self._stats["cache_hits"] += 1
+                return result
+            except Exception as e:
+                logger.warning("⚠️ Redis get_recent failed, falling back to memory: %s", e)
+                self._handle_redis_error(e)
+        
+        # Fallback to in-memory cache
         with self._lock:
-            # Try Redis first
-            if self._check_redis():
-                try:
-                    # Get most recent items from sorted set (highest scores)
-                    items = self._redis_client.zrevrange(self._redis_key, 0, limit - 1)
+            first_valid = self._first_valid_index(datetime.now())
+            recent = list(islice(self._fallback_cache, first_valid, None))[-limit:]
+            return [
+                {
+                    "timestamp": item["timestamp"].isoformat(),
+                    "data": item["data"],
+                    "metadata": item["metadata"],
+                    "seq": item["seq"]
+                }
+                for item in recent
+            ]
+    
+    def get_since(self, since: int, limit: int = 100) -> List[Dict]:
+        """
+        Get cached items added after a sequence cursor, oldest first.
+        
+        Args:
+            since: Sequence number of the last item the caller has seen
+            limit: Maximum number of items to return
+        
+        Returns:
+            Up to limit non-expired items with seq greater than since, in seq order
+        """
+        # Try Redis first
+        if self._check_redis():
+            try:
+                cutoff = datetime.now() - self.ttl
+                result = []
+                cursor = since
+                
+                # Expired members linger in the seq index until trimmed; skip past them
+                while len(result) < limit:
+                    wanted = limit - len(result)
+                    items = self._redis_client.zrangebyscore(
+                        self._redis_seq_index_key,
+                        f"({cursor}",
+                        "+inf",
+                        start=0,
+                        num=wanted,
+                        withscores=True
+                    )
                     
-                    result = []
-                    now = datetime.now()
-                    for item in items:
+                    for item, seq in items:
+                        cursor = int(seq)
                         try:
-                            cache_item = json.loads(item)
-                            # Check if expired
-                            item_time = datetime.fromisoformat(cache_item["timestamp"])
-                            if now - item_time <= self.ttl:
-                                result.append(cache_item)
+                            cache_item = orjson.loads(item)
                         except Exception as e:
-                            print(f"⚠️ Error parsing cache item: {e}")
+                            logger.warning("⚠️ Error parsing cache item: %s", e)
                             continue
+                        if datetime.fromisoformat(cache_item["timestamp"]) >= cutoff:
+                            result.append(cache_item)
                     
+                    if len(items) < wanted:
+                        break
+                
+                with self._lock:
                     self._stats["cache_hits"] += 1
-                    return result
-                except Exception as e:
-                    print(f"⚠️ Redis get_recent failed, falling back to memory: {e}")
-                    self._redis_available = False
-            
-            # Fallback to in-memory cache
-            now = datetime.now()
-            valid_items = [
-                item for item in self._fallback_cache
-                if now - item["timestamp"] <= self.ttl
-            ]
-            
-            recent = list(valid_items)[-limit:]
+                return result
+            except Exception as e:
+                logger.warning("⚠️ Redis get_since failed, falling back to memory: %s", e)
+                self._handle_redis_error(e)
+        
+        # Fallback to in-memory cache (items are in seq order)
+        with self._lock:
+            first_valid = self._first_valid_index(datetime.now())
+            newer = (
+                item for item in islice(self._fallback_cache, first_valid, None)
+                if item["seq"] > since
+            )
             return [
                 {
                     "timestamp": item["timestamp"].isoformat(),
                     "data": item["data"],
-                    "metadata": item["metadata"]
+                    "metadata": item["metadata"],
+                    "seq": item["seq"]
                 }
-                for item in recent
+                for item in islice(newer, limit)
             ]
     
     def get_by_timerange(self, start: datetime, end: datetime) -> List[Dict]:
@@ -156,39 +269,39 @@ class DataCache:
         Args:
             start: Start datetime
             end: End datetime
-            
+        
         Returns:
             List of cache items in the time range
         """
+        # Try Redis first
+        if self._check_redis():
+            try:
+                start_score = start.timestamp()
+                end_score = end.timestamp()
+                
+                # Get items in score range
+                items = self._redis_client.zrangebyscore(
+                    self._redis_key,
+                    start_score,
+                    end_score
+                )
+                
+                result = []
+                for item in items:
+                    try:
+                        cache_item = orjson.loads(item)
+                        result.append(cache_item)
+                    except Exception as e:
+                        logger.warning("⚠️ Error parsing cache item: %s", e)
+                        continue
+                
+                return result
+            except Exception as e:
+                logger.warning("⚠️ Redis get_by_timerange failed, falling back to memory: %s", e)
+                self._handle_redis_error(e)
+        
+        # Fallback to in-memory cache
         with self._lock:
-            # Try Redis first
-            if self._check_redis():
-                try:
-                    start_score = start.timestamp()
-                    end_score = end.timestamp()
-                    
-                    # Get items in score range
-                    items = self._redis_client.zrangebyscore(
-                        self._redis_key,
-                        start_score,
-                        end_score
-                    )
-                    
-                    result = []
-                    for item in items:
-                        try:
-                            cache_item = json.loads(item)
-                            result.append(cache_item)
-                        except Exception as e:
-                            print(f"⚠️ Error parsing cache item: {e}")
-                            continue
-                    
-                    return result
-                except Exception as e:
-                    print(f"⚠️ Redis get_by_timerange failed, falling back to memory: {e}")
-                    self._redis_available = False
-            
-            # Fallback to in-memory cache
             return [
                 {
                     "timestamp": item["timestamp"].isoformat(),
@@ -206,33 +319,33 @@ class DataCache:
         Args:
             key: Key to search in data
             value: Value to match
-            
+        
         Returns:
             List of matching cache items
         """
+        # Try Redis first
+        if self._check_redis():
+            try:
+                # Get all items and filter
+                items = self._redis_client.zrange(self._redis_key, 0, -1)
+                
+                results = []
+                for item in items:
+                    try:
+                        cache_item = orjson.loads(item)
+                        data = cache_item["data"]
+                        if isinstance(data, dict) and data.get(key) == value:
+                            results.append(cache_item)
+                    except Exception:
+                        continue
+                
+                return results
+            except Exception as e:
+                logger.warning("⚠️ Redis search failed, falling back to memory: %s", e)
+                self._handle_redis_error(e)
+        
+        # Fallback to in-memory cache
         with self._lock:
-            # Try Redis first
-            if self._check_redis():
-                try:
-                    # Get all items and filter
-                    items = self._redis_client.zrange(self._redis_key, 0, -1)
-                    
-                    results = []
-                    for item in items:
-                        try:
-                            cache_item = json.loads(item)
-                            data = cache_item["data"]
-                            if isinstance(data, dict) and data.get(key) == value:
-                                results.append(cache_item)
-                        except Exception:
-                            continue
-                    
-                    return results
-                except Exception as e:
-                    print(f"⚠️ Redis search failed, falling back to memory: {e}")
-                    self._redis_available = False
-            
-            # Fallback to in-memory cache
             results = []
             for item in self._fallback_cache:
                 data = item["data"]
@@ -250,32 +363,32 @@ class DataCache:
         
         Args:
             data: Exact data to match
-            
+        
         Returns:
             List of matching cache items
         """
+        # Try Redis first
+        if self._check_redis():
+            try:
+                # Get all items and filter
+                items = self._redis_client.zrange(self._redis_key, 0, -1)
+                
+                results = []
+                for item in items:
+                    try:
+                        cache_item = orjson.loads(item)
+                        if cache_item["data"] == data:
+                            results.append(cache_item)
+                    except Exception:
+                        continue
+                
+                return results
+            except Exception as e:
+                logger.warning("⚠️ Redis search_exact_data failed, falling back to memory: %s", e)
+                self._handle_redis_error(e)
+        
+        # Fallback to in-memory cache
         with self._lock:
-            # Try Redis first
-            if self._check_redis():
-                try:
-                    # Get all items and filter
-                    items = self._redis_client.zrange(self._redis_key, 0, -1)
-                    
-                    results = []
-                    for item in items:
-                        try:
-                            cache_item = json.loads(item)
-                            if cache_item["data"] == data:
-                                results.append(cache_item)
-                        except Exception:
-                            continue
-                    
-                    return results
-                except Exception as e:
-                    print(f"⚠️ Redis search_exact_data failed, falling back to memory: {e}")
-                    self._redis_available = False
-            
-            # Fallback to in-memory cache
             results = []
             for item in self._fallback_cache:
                 if item["data"] == data:
@@ -293,18 +406,19 @@ class DataCache:
         Returns:
             Dictionary with cache statistics (datetime serialized)
         """
-        with self._lock:
-            # Try Redis first
-            if self._check_redis():
-                try:
-                    # Get count from Redis
-                    total_items = self._redis_client.zcard(self._redis_key)
-                    
-                    # Count valid (non-expired) items
-                    now = datetime.now()
-                    cutoff_score = (now - self.ttl).timestamp()
-                    valid_count = self._redis_client.zcount(self._redis_key, cutoff_score, "+inf")
-                    
+        # Try Redis first
+        if self._check_redis():
+            try:
+                now = datetime.now()
+                cutoff_score = (now - self.ttl).timestamp()
+                
+                # Total and valid (non-expired) counts in one round-trip
+                pipe = self._redis_client.pipeline(transaction=False)
+                pipe.zcard(self._redis_key)
+                pipe.zcount(self._redis_key, cutoff_score, "+inf")
+                total_items, valid_count = pipe.execute()
+                
+                with self._lock:
                     stats = {
                         **self._stats,
                         "current_size": total_items,
@@ -314,21 +428,18 @@ class DataCache:
                         "backend": "redis",
                         "redis_key": self._redis_key
                     }
-                    
-                    if stats["last_updated"]:
-                        stats["last_updated"] = stats["last_updated"].isoformat()
-                    
-                    return stats
-                except Exception as e:
-                    print(f"⚠️ Redis get_stats failed, falling back to memory: {e}")
-                    self._redis_available = False
-            
-            # Fallback to in-memory cache
-            now = datetime.now()
-            valid_count = sum(
-                1 for item in self._fallback_cache
-                if now - item["timestamp"] <= self.ttl
-            )
+                
+                if stats["last_updated"]:
+                    stats["last_updated"] = stats["last_updated"].isoformat()
+                
+                return stats
+            except Exception as e:
+                logger.warning("⚠️ Redis get_stats failed, falling back to memory: %s", e)
+                self._handle_redis_error(e)
+        
+        # Fallback to in-memory cache
+        with self._lock:
+            valid_count = len(self._fallback_cache) - self._first_valid_index(datetime.now())
             
             stats = {
                 **self._stats,
@@ -341,23 +452,24 @@ class DataCache:
             
             if stats["last_updated"]:
                 stats["last_updated"] = stats["last_updated"].isoformat()
-                
+            
             return stats
     
     def clear(self) -> None:
         """Clear all cached data from Redis and fallback cache."""
+        # Clear Redis
+        if self._check_redis():
+            try:
+                self._redis_client.delete(self._redis_key, self._redis_seq_index_key)
+                logger.info("✓ Redis cache cleared")
+            except Exception as e:
+                logger.warning("⚠️ Redis clear failed: %s", e)
+                self._handle_redis_error(e)
+        
+        # Clear in-memory fallback
         with self._lock:
-            # Clear Redis
-            if self._check_redis():
-                try:
-                    self._redis_client.delete(self._redis_key)
-                    print("✓ Redis cache cleared")
-                except Exception as e:
-                    print(f"⚠️ Redis clear failed: {e}")
-                    self._redis_available = False
-            
-            # Clear in-memory fallback
             self._fallback_cache.clear()
+            self._fallback_ts.clear()
             
             # Reset stats
             using_redis = self._stats.get("using_redis", False)
@@ -368,6 +480,7 @@ class DataCache:
                 "last_updated": None,
                 "using_redis": using_redis
             }
+            self._version += 1
     
     def cleanup_expired(self) -> int:
         """
@@ -376,40 +489,59 @@ class DataCache:
         Returns:
             Number of items removed
         """
+        removed_count = 0
+        
+        # Clean up Redis
+        if self._check_redis():
+            try:
+                now = datetime.now()
+                cutoff_score = (now - self.ttl).timestamp()
+                
+                # Remove items older than TTL
+                removed_count = self._redis_client.zremrangebyscore(
+                    self._redis_key,
+                    "-inf",
+                    cutoff_score
+                )
+                
+                if removed_count > 0:
+                    logger.info("✓ Cleaned up %s expired items from Redis", removed_count)
+                    with self._lock:
+                        self._version += 1
+                
+                return removed_count
+            except Exception as e:
+                logger.warning("⚠️ Redis cleanup failed: %s", e)
+                self._handle_redis_error(e)
+        
+        # Clean up in-memory fallback
         with self._lock:
-            removed_count = 0
+            removed_count = self._first_valid_index(datetime.now())
             
-            # Clean up Redis
-            if self._check_redis():
-                try:
-                    now = datetime.now()
-                    cutoff_score = (now - self.ttl).timestamp()
-                    
-                    # Remove items older than TTL
-                    removed_count = self._redis_client.zremrangebyscore(
-                        self._redis_key,
-                        "-inf",
-                        cutoff_score
-                    )
-                    
-                    if removed_count > 0:
-                        print(f"✓ Cleaned up {removed_count} expired items from Redis")
-                    
-                    return removed_count
-                except Exception as e:
-                    print(f"⚠️ Redis cleanup failed: {e}")
-                    self._redis_available = False
+            # Expired items are always the oldest, at the left end
+            for _ in range(removed_count):
+                self._fallback_cache.popleft()
+                self._fallback_ts.popleft()
             
-            # Clean up in-memory fallback
-            now = datetime.now()
-            original_size = len(self._fallback_cache)
+            if removed_count > 0:
+                self._version += 1
             
-            self._fallback_cache = deque(
-                (item for item in self._fallback_cache if now - item["timestamp"] <= self.ttl),
-                maxlen=self.max_size
-            )
-            
-            return original_size - len(self._fallback_cache)
+            return removed_count
+    
+    def _first_valid_index(self, now: datetime) -> int:
+        """
+        Find the first non-expired item in the fallback cache.
+        
+        Items are appended in time order, so a binary search over their
+        timestamps replaces a scan of the whole cache. Call with the lock held.
+        
+        Args:
+            now: Reference time for the TTL check
+        
+        Returns:
+            Index of the first item younger than the TTL
+        """
+        return bisect.bisect_left(self._fallback_ts, now - self.ttl)
     
     def _init_redis(self) -> None:
         """Initialize Redis connection with configured prefix."""
@@ -420,60 +552,90 @@ class DataCache:
                 port=settings.REDIS_PORT,
                 db=settings.REDIS_DB,
                 password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
-                decode_responses=False,  # We handle JSON encoding
+                decode_responses=False,  # Members are orjson bytes
                 socket_connect_timeout=5,
                 socket_timeout=5
             )
+            self._add_script = self._redis_client.register_script(_ADD_SCRIPT)
             
             # Test connection
             self._redis_client.ping()
+            
+            self._raise_redis_seq()
             self._redis_available = True
             self._stats["using_redis"] = True
             
-            print(f"✓ DataCache: Redis connection established")
-            print(f"  → Key prefix: {self._redis_prefix}")
-            print(f"  → Full key: {self._redis_key}")
-            
+            logger.info("✓ DataCache: Redis connection established")
+            logger.info("  → Key prefix: %s", self._redis_prefix)
+            logger.info("  → Full key: %s", self._redis_key)
+        
         except Exception as e:
-            print(f"⚠️ DataCache: Redis unavailable, using in-memory fallback: {e}")
+            logger.warning("⚠️ DataCache: Redis unavailable, using in-memory fallback: %s", e)
             self._redis_client = None
             self._redis_available = False
             self._stats["using_redis"] = False
     
+    def _raise_redis_seq(self) -> None:
+        """Raise the Redis seq counter past any sequence number issued in memory."""
+        with self._lock:
+            seq = self._seq
+        if not seq:
+            return
+        
+        current = int(self._redis_client.get(self._redis_seq_key) or 0)
+        if current < seq:
+            # INCRBY only ever raises the counter, even if another writer raced us
+            self._redis_client.incrby(self._redis_seq_key, seq - current)
+    
     def _check_redis(self) -> bool:
         """
-        Check if Redis is available and reconnect if needed.
+        Check if Redis is currently marked available.
+        
+        Connection loss is detected by the failing command itself and
+        recovered by health_check(), so no PING is issued here.
         
         Returns:
             True if Redis is available, False otherwise
         """
-        if self._redis_available and self._redis_client:
+        return self._redis_available and self._redis_client is not None
+    
+    def _handle_redis_error(self, error: Exception) -> None:
+        """
+        Mark Redis unavailable if a command failed on the connection.
+        
+        Args:
+            error: Exception raised by the Redis command
+        """
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            self._redis_available = False
+            self._stats["using_redis"] = False
+    
+    def health_check(self) -> bool:
+        """
+        Ping Redis, or try to reconnect if it is marked unavailable.
+        
+        Returns:
+            True if Redis is available, False otherwise
+        """
+        if self._check_redis():
             try:
-                # Quick ping to check connection
                 self._redis_client.ping()
                 return True
             except Exception:
-                print("⚠️ Redis connection lost, attempting reconnect...")
+                logger.warning("⚠️ Redis connection lost, attempting reconnect...")
                 self._redis_available = False
         
-        # Try to reconnect if not available
-        if not self._redis_available:
-            try:
-                self._init_redis()
-                return self._redis_available
-            except Exception:
-                return False
-        
-        return False
+        self._init_redis()
+        return self._redis_available
     
     def close(self) -> None:
         """Close Redis connection."""
         if self._redis_client:
             try:
                 self._redis_client.close()
-                print("✓ Redis cache connection closed")
+                logger.info("✓ Redis cache connection closed")
             except Exception as e:
-                print(f"⚠️ Error closing Redis connection: {e}")
+                logger.warning("⚠️ Error closing Redis connection: %s", e)
             finally:
                 self._redis_client = None
                 self._redis_available = False
@@ -481,3 +643,10 @@ class DataCache:
 
 # Singleton instance
 data_cache = DataCache(max_size=1000, ttl_seconds=3600)
+
+
+async def monitor_redis(interval_s: float = 30.0) -> None:
+    """Periodically ping Redis and reconnect the cache if it went away."""
+    while True:
+        await asyncio.sleep(interval_s)
+        await asyncio.to_thread(data_cache.health_check)
@@ -1,8 +1,137 @@
 """ClickHouse service for database operations."""
 
-from typing import Any, List, Optional, Dict
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, List, Optional, Dict, Sequence, Union
 import clickhouse_connect
+from clickhouse_connect import common as clickhouse_common
+from clickhouse_connect.driver.exceptions import OperationalError
 from app.core.config import settings
+from app.core.log import get_logger
+
+logger = get_logger(__name__)
+
+# No per-client session, so queries from different threads can run concurrently
+clickhouse_common.set_setting('autogenerate_session_id', False)
+
+# Let the server buffer small inserts into larger parts; the insert returns
+# before the data is flushed, so rows can be lost if the server crashes
+ASYNC_INSERT_SETTINGS = {
+    'async_insert': 1,
+    'async_insert_max_data_size': 10_000_000,
+    'async_insert_busy_timeout_ms': 200,
+    'wait_for_async_insert': 0
+}
+
+
+class ClickHousePool:
+    """Bounded pool of ClickHouse clients for use from async code."""
+    
+    def __init__(self, factory: Callable[[], Any], min_size: int = 1, max_size: int = 10):
+        """
+        Initialize client pool.
+        
+        Args:
+            factory: Callable creating a new connected client
+            min_size: Number of clients to create up front in open()
+            max_size: Maximum number of clients alive at once
+        """
+        self._factory = factory
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_size)
+        self._size = 0
+        self._stats = {
+            "acquired": 0,
+            "created": 0,
+            "discarded": 0,
+            "waits": 0
+        }
+    
+    async def open(self) -> None:
+        """Create clients up to min_size."""
+        while self._size < self.min_size:
+            client = await self._create()
+            self._idle.put_nowait(client)
+    
+    async def _create(self) -> Any:
+        """Create a new client in a worker thread."""
+        client = await asyncio.to_thread(self._factory)
+        self._size += 1
+        self._stats["created"] += 1
+        return client
+    
+    def _discard(self, client: Any) -> None:
+        """Drop a client that failed."""
+        self._size -= 1
+        self._stats["discarded"] += 1
+        try:
+            client.close()
+        except Exception:
+            pass
+    
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """
+        Borrow a client for the duration of the context.
+        
+        At most max_size clients are borrowed at once; further callers wait.
+        Clients are returned to the pool after success or a query the server
+        rejected, so a bad query does not force a reconnect. On transport
+        errors (OperationalError) or cancellation they are discarded, since
+        the connection may still be mid-request.
+        """
+        if self._slots.locked():
+            self._stats["waits"] += 1
+        await self._slots.acquire()
+        client = None
+        returned = False
+        try:
+            try:
+                client = self._idle.get_nowait()
+            except asyncio.QueueEmpty:
+                client = await self._create()
+            
+            self._stats["acquired"] += 1
+            try:
+                yield client
+            except OperationalError:
+                raise  # Discarded below
+            except Exception:
+                self._idle.put_nowait(client)
+                returned = True
+                raise
+            else:
+                self._idle.put_nowait(client)
+                returned = True
+        finally:
+            if client is not None and not returned:
+                self._discard(client)
+            self._slots.release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool statistics.
+        
+        Returns:
+            Dictionary with pool size and usage counters
+        """
+        idle = self._idle.qsize()
+        return {
+            **self._stats,
+            "size": self._size,
+            "idle": idle,
+            "in_use": self._size - idle,
+            "min_size": self.min_size,
+            "max_size": self.max_size
+        }
+    
+    def close(self) -> None:
+        """Close all idle clients."""
+        while not self._idle.empty():
+            self._discard(self._idle.get_nowait())
 
 
 class ClickHouseService:
@@ -15,99 +144,194 @@ class ClickHouseService:
         self.database = settings.CLICKHOUSE_DATABASE
         self.user = settings.CLICKHOUSE_USER
         self.password = settings.CLICKHOUSE_PASSWORD
-        self._client = None
+        self.compression = settings.CLICKHOUSE_COMPRESSION
+        
+        # Short concurrent queries; don't let each one claim every core
+        self.default_query_settings = (
+            {'max_threads': settings.CLICKHOUSE_MAX_THREADS}
+            if settings.CLICKHOUSE_MAX_THREADS > 0 else {}
+        )
+        
+        # Monotonic time of the last successful query, used by test_connection
+        self._last_ok = 0.0
+        
+        self.pool = ClickHousePool(
+            self._create_client,
+            min_size=settings.CLICKHOUSE_POOL_MIN,
+            max_size=settings.CLICKHOUSE_POOL_MAX
+        )
     
-    def get_client(self):
-        """Get or create ClickHouse client."""
-        if self._client is None:
-            try:
-                print(f"🔌 Connecting to ClickHouse: {self.host}:{self.port}/{self.database}")
-                self._client = clickhouse_connect.get_client(
-                    host=self.host,
-                    port=self.port,
-                    database=self.database,
-                    username=self.user,
-                    password=self.password
-                )
-                print("✓ ClickHouse connection established")
-            except Exception as e:
-                print(f"❌ Failed to connect to ClickHouse: {e}")
-                self._client = None
+    def _create_client(self):
+        """Create a new ClickHouse client."""
+        return clickhouse_connect.get_client(
+            host=self.host,
+            port=self.port,
+            database=self.database,
+            username=self.user,
+            password=self.password,
+            compress=self.compression
+        )
+    
+    @staticmethod
+    def _run_query(
+        client,
+        query: str,
+        params: Optional[Dict[str, Any]],
+        columnar: bool,
+        query_settings: Optional[Dict[str, Any]]
+    ) -> Union[List[Dict[str, Any]], Dict[str, list]]:
+        """
+        Run a query and shape its result (called in a worker thread).
         
-        return self._client
+        Args:
+            client: Pooled ClickHouse client
+            query: SQL query to execute
+            params: Optional query parameters
+            columnar: Return a dict of column lists instead of row dicts
+            query_settings: ClickHouse settings for this query
+        
+        Returns:
+            Row dicts, or column lists keyed by column name
+        """
+        result = client.query(query, parameters=params, settings=query_settings)
+        columns = result.column_names
+        
+        if columnar:
+            return dict(zip(columns, result.result_columns))
+        
+        # Convert to list of dicts
+        return [dict(zip(columns, row)) for row in result.result_rows]
     
-    def execute_query(self, query: str) -> Optional[List[Dict[str, Any]]]:
+    async def execute_query(
+        self,
+        query: str,
+        params: Optional[Dict[str, Any]] = None,
+        columnar: bool = False,
+        query_settings: Optional[Dict[str, Any]] = None
+    ) -> Optional[Union[List[Dict[str, Any]], Dict[str, list]]]:
         """
-        Execute a query on ClickHouse.
+        Execute a query on ClickHouse using a pooled client.
         
         Args:
             query: SQL query to execute
-            
+            params: Optional query parameters
+            columnar: Return a dict of column lists instead of row dicts
+            query_settings: ClickHouse settings overriding the defaults (max_threads)
+        
         Returns:
             Query results or None if error occurs
         """
         try:
-            client = self.get_client()
-            if client is None:
-                print("❌ ClickHouse client is not available")
-                return None
-            
-            print(f"⚙️ Executing query: {query[:100]}...")
+            logger.debug("⚙️ Executing query: %.100s...", query)
             
-            # Execute query and get results as list of dicts
-            result = client.query(query)
-            rows = result.result_rows
-            columns = result.column_names
-            
-            # Convert to list of dicts
-            results = []
-            for row in rows:
-                row_dict = dict(zip(columns, row))
-                results.append(row_dict)
+            async with self.pool.acquire() as client:
+                # Build the result off the event loop along with the query itself
+                results = await asyncio.to_thread(
+                    self._run_query,
+                    client,
+                    query,
+                    params,
+                    columnar,
+                    {**self.default_query_settings, **(query_settings or {})}
+                )
             
-            print(f"✓ Query executed successfully, returned {len(results)} rows")
+            self._last_ok = time.monotonic()
+            row_count = len(next(iter(results.values()), ())) if columnar else len(results)
+            logger.debug("✓ Query executed successfully, returned %s rows", row_count)
             return results
-            
+        
         except Exception as e:
-            print(f"❌ Error executing ClickHouse query: {e}")
-            import traceback
-            traceback.print_exc()
-            # Reset client on error
-            self._client = None
+            logger.error("❌ Error executing ClickHouse query: %s", e, exc_info=settings.DEBUG)
             return None
     
-    def test_connection(self) -> bool:
+    async def insert_batch(
+        self,
+        table: str,
+        rows: Sequence[Sequence[Any]],
+        column_names: List[str],
+        column_oriented: bool = False,
+        async_insert: bool = False
+    ) -> bool:
         """
-        Test ClickHouse connection.
+        Insert many rows as a single native block using a pooled client.
+        
+        Args:
+            table: Target table name
+            rows: Row sequences, or column sequences if column_oriented
+            column_names: Column names matching the row/column order
+            column_oriented: rows holds one sequence per column
+            async_insert: Use server-side async inserts (see ASYNC_INSERT_SETTINGS)
+                for small, frequent batches such as per-message writes
+        
+        Returns:
+            True if the insert succeeded, False otherwise
+        """
+        if not rows:
+            return True
+        
+        try:
+            async with self.pool.acquire() as client:
+                summary = await asyncio.to_thread(
+                    client.insert,
+                    table,
+                    rows,
+                    column_names=column_names,
+                    column_oriented=column_oriented,
+                    settings=ASYNC_INSERT_SETTINGS if async_insert else None
+                )
+            
+            logger.debug("✓ Inserted %s rows into %s", summary.written_rows, table)
+            return True
+        
+        except Exception as e:
+            logger.error("❌ Error inserting into %s: %s", table, e, exc_info=settings.DEBUG)
+            return False
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool statistics.
+        
+        Returns:
+            Dictionary with pool size and usage counters
+        """
+        return self.pool.get_stats()
+    
+    async def test_connection(self, max_age_s: float = 5.0) -> bool:
+        """
+        Test ClickHouse connection using a pooled client.
+        
+        A query that succeeded within max_age_s counts as a passed test, so
+        the SELECT 1 round-trip is skipped while the listener is polling.
+        
+        Args:
+            max_age_s: How recent a successful query must be to skip the probe
         
         Returns:
             True if connection successful, False otherwise
         """
+        if time.monotonic() - self._last_ok < max_age_s:
+            return True
+        
         try:
-            print(f"🔌 Testing ClickHouse connection: {self.host}:{self.port}/{self.database}")
+            logger.debug("🔌 Testing ClickHouse connection: %s:%s/%s", self.host, self.port, self.database)
             
-            client = self.get_client()
-            if client is None:
-                return False
+            async with self.pool.acquire() as client:
+                await asyncio.to_thread(client.query, "SELECT 1 as test")
             
-            result = client.query("SELECT 1 as test")
-            print("✓ ClickHouse connection test passed")
-            return True
+            self._last_ok = time.monotonic()
             
+            logger.debug("✓ ClickHouse connection test passed")
+            return True
+        
         except Exception as e:
-            print(f"❌ ClickHouse connection test failed: {e}")
-            self._client = None
+            # The pool has already discarded the client if the connection failed
+            logger.error("❌ ClickHouse connection test failed: %s", e)
             return False
     
     def close(self):
-        """Close ClickHouse connection."""
-        if self._client:
-            try:
-                self._client.close()
-                print("✓ ClickHouse connection closed")
-            except Exception as e:
-                print(f"⚠️ Error closing ClickHouse connection: {e}")
-            self._client = None
+        """Close pooled ClickHouse connections."""
+        self.pool.close()
+        logger.info("✓ ClickHouse connection closed")
 
 
 # Singleton instance
@@ -2,7 +2,9 @@
 
 import asyncio
 import json
+import orjson
 from pathlib import Path
+from itertools import chain
 import math
 from typing import Optional, Callable, List, Dict, Any
 from datetime import datetime, timedelta
@@ -12,6 +14,7 @@ import numpy as np
 import pandas as pd
 
 from app.core.config import settings
+from app.core.log import get_logger
 from app.services.clickhouse import clickhouse_service
 from app.services.cache import data_cache
 from app.controllers.matching_controller import matching_controller
@@ -22,8 +25,10 @@ try:
     HAS_MATCHING = True
 except ImportError:
     HAS_MATCHING = False
-    
-    
+
+logger = get_logger(__name__)
+
+
 POLYGON_DEBUG_LISTEN=False
 POLYGON_DEBUG_LISTEN_GEOM=[
         [
@@ -50,52 +55,143 @@ POLYGON_DEBUG_LISTEN_GEOM=[
         ]
     ]
 
-class DateTimeEncoder(json.JSONEncoder):
-    """JSON encoder that handles datetime objects."""
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+# Camera FOV frame replayed by the polygon debug mode, encoded once
+_MOCK_FOV_MESSAGE = orjson.dumps({
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {
+                "name": "Camera Position",
+                "type": "camera",
+                "bearing": 270,
+                "zoom": 30,
+                "camera_height_m": 30
+            },
+            "geometry": {
+                "type": "Point",
+                "coordinates": [
+                    116.809655,
+                    -1.279656
+                ]
+            }
+        },
+        {
+            "type": "Feature",
+            "properties": {
+                "type": "visible_sea_area",
+                "bearing": 45,
+                "zoom": 10
+            },
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": POLYGON_DEBUG_LISTEN_GEOM
+            }
+        }
+    ]
+}).decode()
+
+# Incremental polling queries; the text is fixed so only bound parameters vary
+_AIS_INCREMENTAL_SQL = """
+    SELECT 
+        mmsi,
+        toFloat64(latitude) as lat,
+        toFloat64(longitude) as lon,
+        toFloat64(speed) as sog,
+        toFloat64(course) as cog,
+        toFloat64(heading) as heading,
+        ts,
+        ship_name,
+        ship_type
+    FROM ais_data
+    WHERE ts > {since:DateTime}
+      AND latitude BETWEEN {min_lat:Float64} AND {max_lat:Float64}
+      AND longitude BETWEEN {min_lon:Float64} AND {max_lon:Float64}
+    ORDER BY ts ASC
+"""
+
+_ARPA_INCREMENTAL_SQL = """
+    SELECT 
+        target_number as target,
+        toFloat64(latitude) as lat,
+        toFloat64(longitude) as lon,
+        toFloat64(speed) as speed,
+        toFloat64(course) as course,
+        recv_at,
+        source
+    FROM arpa_data
+    WHERE recv_at > {since:DateTime}
+      AND latitude BETWEEN {min_lat:Float64} AND {max_lat:Float64}
+      AND longitude BETWEEN {min_lon:Float64} AND {max_lon:Float64}
+    ORDER BY recv_at ASC
+"""
+
+
+def _orjson_default(obj):
+    """Fallback for objects orjson cannot encode natively (e.g. pandas Timestamp)."""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def orjson_dumps(data: Any) -> bytes:
+    """Encode data with orjson, handling numpy values and datetime-likes."""
+    return orjson.dumps(data, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
 
 
 class WebSocketListener:
     """Service for listening to external WebSocket and processing messages."""
     
+    # Record fields used to build the matching frames, and defaults for missing ones
+    _ARPA_COLUMNS = ('lat', 'lon', 'speed', 'course', 'recv_at', 'source')
+    _ARPA_DEFAULTS = {'speed': 0.0, 'source': 'unknown'}
+    _AIS_COLUMNS = ('lat', 'lon', 'sog', 'cog', 'heading', 'heading_az', 'ts', 'ship_name', 'ship_type')
+    _AIS_DEFAULTS = {'sog': 0.0, 'ship_name': '', 'ship_type': 0}
+    
     def __init__(self):
         """Initialize WebSocket listener."""
         self.url = settings.WEBSOCKET_URL
         self.reconnect_delay = settings.WEBSOCKET_RECONNECT_DELAY
         self.client_connection: Optional[WebSocket] = None
         self.is_running = False
-        self.connected_clients: list[WebSocket] = []
+        # Each client gets a bounded outbound queue drained by its own writer task
+        self.connected_clients: Dict[WebSocket, asyncio.Queue] = {}
+        self.client_queue_size = settings.WEBSOCKET_CLIENT_QUEUE_SIZE
+        self._close_tasks: set = set()  # Closes of dropped slow clients still in flight
         self.listener_task: Optional[asyncio.Task] = None
         self.is_active = settings.WEBSOCKET_AUTO_START  # Control flag
         self._websocket_connection = None
         
+        # Messages are processed in background tasks, at most this many at once
+        self._message_slots = asyncio.Semaphore(max(settings.WEBSOCKET_MAX_CONCURRENT_MESSAGES, 1))
+        self._pending_messages: set = set()
+        self._message_seq = 0
+        self._last_result_seq = 0
+        
         # Polling system properties
         self.ais_cache: Dict[str, Dict] = {}  # mmsi -> {data}
         self.arpa_cache: Dict[str, Dict] = {}  # target -> {data}
         self.last_ais_fetch: Optional[datetime] = None
         self.last_arpa_fetch: Optional[datetime] = None
-        self.cache_ttl = getattr(settings, 'CACHE_TTL_S', 3600)
+        self.cache_ttl = settings.CACHE_TTL_S
         
         # Projection and bbox for polling
-        self.site_lat = getattr(settings, 'SITE_LAT', -1.279656)
-        self.site_lon = getattr(settings, 'SITE_LON', 116.809655)
-        self.filter_radius_km = getattr(settings, 'FILTER_RADIUS_KM', 60.0)
-        self.projection = getattr(settings, 'PROJECTION', 'EPSG:32650')
+        self.site_lat = settings.SITE_LAT
+        self.site_lon = settings.SITE_LON
+        self.filter_radius_km = settings.FILTER_RADIUS_KM
+        self.projection = settings.PROJECTION
         self.transformer = None
         self.bbox = None
         
         # Gating and scoring params
-        self.gating_distance_m = getattr(settings, 'GATING_DISTANCE_M', 8000.0)
-        self.time_gate_s = getattr(settings, 'TIME_GATE_S', 1800.0)
-        self.match_threshold = getattr(settings, 'MATCH_THRESHOLD', 0.6)
+        self.gating_distance_m = settings.GATING_DISTANCE_M
+        self.time_gate_s = settings.TIME_GATE_S
+        self.match_threshold = settings.MATCH_THRESHOLD
         self.scoring_params = ScoringParams(
-            pos_sigma_m=getattr(settings, 'POS_SIGMA_M', 500.0),
-            spd_sigma_ms=getattr(settings, 'SPD_SIGMA_MS', 3.0),
-            hdg_sigma_deg=getattr(settings, 'HDG_SIGMA_DEG', 40.0),
-            time_sigma_s=getattr(settings, 'TIME_SIGMA_S', 60.0)
+            pos_sigma_m=settings.POS_SIGMA_M,
+            spd_sigma_ms=settings.SPD_SIGMA_MS,
+            hdg_sigma_deg=settings.HDG_SIGMA_DEG,
+            time_sigma_s=settings.TIME_SIGMA_S
         ) if HAS_MATCHING else None
         self.demo_message_path = Path(__file__).parent.parent.parent / "data" / "demo_message.json"
     
@@ -104,13 +200,13 @@ class WebSocketListener:
             if self.demo_message_path.exists():
                 with open(self.demo_message_path, 'r') as f:
                     demo_data = json.load(f)
-                    print(f"✓ Loaded demo message from {self.demo_message_path}")
+                    logger.info("✓ Loaded demo message from %s", self.demo_message_path)
                     return json.dumps(demo_data)
             else:
-                print(f"⚠️ Demo message file not found at {self.demo_message_path}")
+                logger.warning("⚠️ Demo message file not found at %s", self.demo_message_path)
                 return None
         except Exception as e:
-            print(f"❌ Error loading demo message: {str(e)}")
+            logger.error("❌ Error loading demo message: %s", e)
             return None
     
     def calculate_azimuth(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -146,191 +242,166 @@ class WebSocketListener:
             del cache[key]
         
         if keys_to_remove:
-            print(f"  Pruned {len(keys_to_remove)} old entries from cache")
+            logger.info("  Pruned %s old entries from cache", len(keys_to_remove))
+    
+    @staticmethod
+    def _incremental_params(since: datetime, bbox: Dict) -> Dict[str, Any]:
+        """Bind parameters shared by the incremental AIS/ARPA queries."""
+        return {
+            'since': since,
+            'min_lat': bbox['min_lat'],
+            'max_lat': bbox['max_lat'],
+            'min_lon': bbox['min_lon'],
+            'max_lon': bbox['max_lon']
+        }
     
     async def fetch_ais_incremental(self, since: datetime, bbox: Dict) -> List[Dict]:
         """Fetch AIS data since last fetch time within bbox."""
         try:
-            query = f"""
-                SELECT 
-                    mmsi,
-                    toFloat64(latitude) as lat,
-                    toFloat64(longitude) as lon,
-                    toFloat64(speed) as sog,
-                    toFloat64(course) as cog,
-                    toFloat64(heading) as heading,
-                    ts,
-                    ship_name,
-                    ship_type
-                FROM ais_data
-                WHERE ts > %(since)s
-                  AND latitude BETWEEN %(min_lat)s AND %(max_lat)s
-                  AND longitude BETWEEN %(min_lon)s AND %(max_lon)s
-                ORDER BY ts ASC
-            """
-            
-            params = {
-                'since': since,
-                'min_lat': bbox['min_lat'],
-                'max_lat': bbox['max_lat'],
-                'min_lon': bbox['min_lon'],
-                'max_lon': bbox['max_lon']
-            }
-            
-            result = await clickhouse_service.execute_query(query, params)
+            result = await clickhouse_service.execute_query(
+                _AIS_INCREMENTAL_SQL,
+                self._incremental_params(since, bbox)
+            )
             return result if result else []
         except Exception as e:
-            print(f"❌ Error fetching incremental AIS: {e}")
+            logger.error("❌ Error fetching incremental AIS: %s", e)
             return []
     
     async def fetch_arpa_incremental(self, since: datetime, bbox: Dict) -> List[Dict]:
         """Fetch ARPA data since last fetch time within bbox."""
         try:
-            query = f"""
-                SELECT 
-                    target_number as target,
-                    toFloat64(latitude) as lat,
-                    toFloat64(longitude) as lon,
-                    toFloat64(speed) as speed,
-                    toFloat64(course) as course,
-                    recv_at,
-                    source
-                FROM arpa_data
-                WHERE recv_at > %(since)s
-                  AND latitude BETWEEN %(min_lat)s AND %(max_lat)s
-                  AND longitude BETWEEN %(min_lon)s AND %(max_lon)s
-                ORDER BY recv_at ASC
-            """
-            
-            params = {
-                'since': since,
-                'min_lat': bbox['min_lat'],
-                'max_lat': bbox['max_lat'],
-                'min_lon': bbox['min_lon'],
-                'max_lon': bbox['max_lon']
-            }
-            
-            result = await clickhouse_service.execute_query(query, params)
+            result = await clickhouse_service.execute_query(
+                _ARPA_INCREMENTAL_SQL,
+                self._incremental_params(since, bbox)
+            )
             return result if result else []
         except Exception as e:
-            print(f"❌ Error fetching incremental ARPA: {e}")
+            logger.error("❌ Error fetching incremental ARPA: %s", e)
             return []
     
     def build_internal_frames(self) -> tuple:
         """Build DataFrames from cached data for matching."""
         try:
-            # Build ARPA DataFrame
-            arpa_records = []
-            for target, record in self.arpa_cache.items():
-                arpa_records.append({
-                    'target': target,
-                    'lat': record.get('lat'),
-                    'lon': record.get('lon'),
-                    'speed': record.get('speed', 0.0),
-                    'course': record.get('course'),
-                    'recv_at': record.get('recv_at'),
-                    'source': record.get('source', 'unknown')
-                })
-            
-            # Build AIS DataFrame
-            ais_records = []
-            for mmsi, record in self.ais_cache.items():
-                ais_records.append({
-                    'mmsi': mmsi,
-                    'lat': record.get('lat'),
-                    'lon': record.get('lon'),
-                    'sog': record.get('sog', 0.0),
-                    'cog': record.get('cog'),
-                    'heading': record.get('heading'),
-                    'heading_az': record.get('heading_az'),  # Calculated azimuth
-                    'ts': record.get('ts'),
-                    'ship_name': record.get('ship_name', ''),
-                    'ship_type': record.get('ship_type', 0)
-                })
-            
-            arpa_df = pd.DataFrame(arpa_records) if arpa_records else pd.DataFrame()
-            ais_df = pd.DataFrame(ais_records) if ais_records else pd.DataFrame()
-            
+            arpa_df = self._frame_from_cache(self.arpa_cache, 'target', self._ARPA_COLUMNS, self._ARPA_DEFAULTS)
+            ais_df = self._frame_from_cache(self.ais_cache, 'mmsi', self._AIS_COLUMNS, self._AIS_DEFAULTS)
             return arpa_df, ais_df
         except Exception as e:
-            print(f"❌ Error building DataFrames: {e}")
+            logger.error("❌ Error building DataFrames: %s", e)
             return pd.DataFrame(), pd.DataFrame()
     
+    @staticmethod
+    def _frame_from_cache(cache: Dict[str, Dict], key_column: str, columns: tuple, defaults: Dict) -> pd.DataFrame:
+        """
+        Build a DataFrame from cached records.
+        
+        Args:
+            cache: Mapping of id -> record
+            key_column: Name of the column holding the cache keys
+            columns: Record fields to keep, in order
+            defaults: Fill values for fields missing from a record
+        
+        Returns:
+            DataFrame with the key column first, or an empty DataFrame
+        """
+        if not cache:
+            return pd.DataFrame()
+        
+        # Only absent keys take a default (None unless given); explicit None stays null
+        base = {**dict.fromkeys(columns), **defaults}
+        return pd.DataFrame.from_records(
+            [{key_column: key, **base, **record} for key, record in cache.items()],
+            columns=[key_column, *columns]
+        )
+    
     def set_client_connection(self, websocket: Optional[WebSocket]):
         """Set the client WebSocket connection."""
         self.client_connection = websocket
     
-    def add_client(self, websocket: WebSocket):
-        """Add a client WebSocket connection."""
-        if websocket not in self.connected_clients:
-            self.connected_clients.append(websocket)
+    def add_client(self, websocket: WebSocket) -> asyncio.Queue:
+        """
+        Add a client WebSocket connection.
+        
+        Returns:
+            Outbound frame queue for the client, to be drained by client_writer()
+        """
+        queue = self.connected_clients.get(websocket)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.client_queue_size)
+            self.connected_clients[websocket] = queue
+        return queue
     
     def remove_client(self, websocket: WebSocket):
         """Remove a client WebSocket connection."""
-        if websocket in self.connected_clients:
-            self.connected_clients.remove(websocket)
+        self.connected_clients.pop(websocket, None)
     
-    async def broadcast_to_clients(self, data: dict):
-        """Broadcast data to all connected clients."""
-        disconnected_clients = []
-        for client in self.connected_clients:
-            try:
-                await client.send_json(data)
-            except Exception as e:
-                print(f"Error sending to client: {e}")
-                disconnected_clients.append(client)
+    async def client_writer(self, websocket: WebSocket, queue: asyncio.Queue):
+        """
+        Drain a client's outbound queue onto its WebSocket.
         
-        # Remove disconnected clients
-        for client in disconnected_clients:
-            self.remove_client(client)
+        Args:
+            websocket: Client WebSocket connection
+            queue: Outbound frame queue returned by add_client()
+        """
+        try:
+            while True:
+                frame = await queue.get()
+                await websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Error sending to client: %s", e)
+            self.remove_client(websocket)
     
     async def listen(self):
         """Start listening to the external WebSocket with auto-reconnect."""
+        try:
+            await self._listen_loop()
+        except asyncio.CancelledError:
+            # Shutting down: don't leave matching tasks running behind us
+            for task in self._pending_messages:
+                task.cancel()
+            raise
+        
+        # Stopped normally: let in-flight messages finish
+        if self._pending_messages:
+            await asyncio.gather(*self._pending_messages, return_exceptions=True)
+    
+    async def _dispatch_message(self, message: str):
+        """
+        Process a message in a background task so the receive loop keeps draining.
+        
+        Waits for a free slot first, so at most WEBSOCKET_MAX_CONCURRENT_MESSAGES
+        messages are processed at once and a slow backend pushes back on recv.
+        
+        Args:
+            message: Raw message from external WebSocket
+        """
+        await self._message_slots.acquire()
+        self._message_seq += 1
+        task = asyncio.create_task(self._process_in_slot(message, self._message_seq))
+        self._pending_messages.add(task)
+        task.add_done_callback(self._pending_messages.discard)
+    
+    async def _process_in_slot(self, message: str, seq: int):
+        """Process a dispatched message and release its slot."""
+        try:
+            await self.process_message(message, seq)
+        finally:
+            self._message_slots.release()
+    
+    async def _listen_loop(self):
+        """Connect, receive and dispatch messages until the listener is stopped."""
         self.is_running = True
         
         # Main reconnection loop - only loops if connection fails
         while self.is_running and self.is_active:
             try:
                 if POLYGON_DEBUG_LISTEN:
-                    print("📢 Polygon debug listen active - skipping actual WebSocket connection")
+                    logger.info("📢 Polygon debug listen active - skipping actual WebSocket connection")
                     
                     while self.is_active and self.is_running:
-                        print(f"📢 Polygon debug listen active - sending mock data")
-                        mock_message = json.dumps({
-                            "type": "FeatureCollection",
-                            "features": [
-                                {
-                                    "type": "Feature",
-                                    "properties": {
-                                        "name": "Camera Position",
-                                        "type": "camera",
-                                        "bearing": 270,
-                                        "zoom": 30,
-                                        "camera_height_m": 30
-                                    },
-                                    "geometry": {
-                                        "type": "Point",
-                                        "coordinates": [
-                                            116.809655,
-                                            -1.279656
-                                        ]
-                                    }
-                                },
-                                {
-                                    "type": "Feature",
-                                    "properties": {
-                                        "type": "visible_sea_area",
-                                        "bearing": 45,
-                                        "zoom": 10
-                                    },
-                                    "geometry": {
-                                        "type": "Polygon",
-                                        "coordinates": POLYGON_DEBUG_LISTEN_GEOM
-                                    }
-                                }
-                            ]
-                        })
-                        await self.process_message(mock_message)
+                        logger.info("📢 Polygon debug listen active - sending mock data")
+                        await self.process_message(_MOCK_FOV_MESSAGE)
                         await asyncio.sleep(5)
                         # demo_message = self.load_demo_message()
                         # if demo_message:
@@ -341,45 +412,45 @@ class WebSocketListener:
                         #     print("Failed to load demo message, stopping listener")
                         #     break
                 else:
-                    print(f"🔌 Connecting to WebSocket: {self.url}")
+                    logger.info("🔌 Connecting to WebSocket: %s", self.url)
                     async with websockets.connect(self.url) as websocket:
                         self._websocket_connection = websocket
-                        print(f"✓ Connected to WebSocket: {self.url}")
+                        logger.info("✓ Connected to WebSocket: %s", self.url)
                         
                         # Listen to messages - this loop stays here as long as connection is alive
                         async for message in websocket:
                             # Quick check if listener was stopped
                             if not self.is_active or not self.is_running:
-                                print("⏸️ Stopping WebSocket listener...")
+                                logger.info("⏸️ Stopping WebSocket listener...")
                                 return
                             
-                            print(f"📩 Received message: {message[:100]}...")
-                            await self.process_message(message)
+                            logger.info("📩 Received message: %.100s...", message)
+                            await self._dispatch_message(message)
                         
                         # Connection closed normally by server
-                        print("⚠️ WebSocket connection closed by server")
+                        logger.warning("⚠️ WebSocket connection closed by server")
             except websockets.exceptions.WebSocketException as e:
-                print(f"❌ WebSocket connection error: {e}")
+                logger.error("❌ WebSocket connection error: %s", e)
                 if self.is_active and self.is_running:
-                    print(f"🔄 Reconnecting in {self.reconnect_delay} seconds...")
+                    logger.info("🔄 Reconnecting in %s seconds...", self.reconnect_delay)
                     await asyncio.sleep(self.reconnect_delay)
                 else:
-                    print("⏸️ Not reconnecting - listener was stopped")
+                    logger.info("⏸️ Not reconnecting - listener was stopped")
                     return
-                    
+            
             except Exception as e:
-                print(f"❌ Unexpected error: {e}")
+                logger.error("❌ Unexpected error: %s", e)
                 if self.is_active and self.is_running:
-                    print(f"🔄 Reconnecting in {self.reconnect_delay} seconds...")
+                    logger.info("🔄 Reconnecting in %s seconds...", self.reconnect_delay)
                     await asyncio.sleep(self.reconnect_delay)
                 else:
-                    print("⏸️ Not reconnecting - listener was stopped")
+                    logger.info("⏸️ Not reconnecting - listener was stopped")
                     return
-                    
+            
             finally:
                 self._websocket_connection = None
         
-        print("🛑 WebSocket listener stopped")
+        logger.info("🛑 WebSocket listener stopped")
     
     def extract_polygon_from_camera_fov(self, geojson_message: dict) -> Optional[List]:
         """
@@ -387,14 +458,14 @@ class WebSocketListener:
         
         Args:
             geojson_message: GeoJSON FeatureCollection from camera FOV WebSocket
-            
+        
         Returns:
             Polygon coordinates as list of [lon, lat] pairs, or None if not found
         """
         try:
             if geojson_message.get("type") == "FeatureCollection":
                 features = geojson_message.get("features", [])
-                print(f"📐 Parsing camera FOV GeoJSON with {len(features)} features")
+                logger.info("📐 Parsing camera FOV GeoJSON with %s features", len(features))
                 
                 for feature in features:
                     # Look for the visible_sea_area feature
@@ -407,40 +478,41 @@ class WebSocketListener:
                                 # GeoJSON Polygon coordinates are [[[lon, lat], ...]]
                                 # Extract the outer ring (first element)
                                 polygon = coordinates[0]
-                                print(f"✅ Extracted visible_sea_area polygon with {len(polygon)} points")
-                                print(f"   Properties: bearing={props.get('bearing')}°, zoom={props.get('zoom')}x")
+                                logger.info("✅ Extracted visible_sea_area polygon with %s points", len(polygon))
+                                logger.info("   Properties: bearing=%s°, zoom=%sx", props.get('bearing'), props.get('zoom'))
                                 return polygon
                 
-                print("⚠️ No visible_sea_area feature found in camera FOV message")
+                logger.warning("⚠️ No visible_sea_area feature found in camera FOV message")
             return None
         except Exception as e:
-            print(f"❌ Error extracting polygon from camera FOV: {e}")
+            logger.error("❌ Error extracting polygon from camera FOV: %s", e)
             return None
     
-    async def process_message(self, message: str):
+    async def process_message(self, message: str, seq: Optional[int] = None):
         """
         Process incoming WebSocket message from external source and send query results back.
         Also broadcasts to connected monitors via FastAPI /ws endpoint.
         
         Args:
             message: Raw message from external WebSocket
+            seq: Arrival order of the message; results older than one already sent are dropped
         """
         try:
             # Try to parse as JSON
             try:
-                data = json.loads(message)
-            except json.JSONDecodeError:
-                print(f"⚠️ Non-JSON message received")
+                data = orjson.loads(message)
+            except orjson.JSONDecodeError:
+                logger.warning("⚠️ Non-JSON message received")
                 data = {"raw_message": message}
             
             # Check if this is a camera FOV GeoJSON message
             if isinstance(data, dict) and data.get("type") == "FeatureCollection":
-                print(f"📹 Detected camera FOV GeoJSON message")
+                logger.info("📹 Detected camera FOV GeoJSON message")
                 polygon = self.extract_polygon_from_camera_fov(data)
                 if polygon:
                     polygon_geojson = [polygon]  # Wrap in one more array for GeoJSON format
                     
-                    print(f"🎯 Calling matching controller with polygon...")
+                    logger.info("🎯 Calling matching controller with polygon...")
                     result = await matching_controller.process_matching(
                         polygon=polygon_geojson,
                         since_minutes=60,
@@ -457,23 +529,17 @@ class WebSocketListener:
                         statistics = matching_data.get("statistics", {})
                         parameters = matching_data.get("parameters", {})
                         
-                        print(f"✅ Matching completed: {statistics.get('matched', 0)} pairs, {statistics.get('unmatched_ais', 0)} unmatched AIS, {statistics.get('unmatched_arpa', 0)} unmatched ARPA")
+                        logger.info("✅ Matching completed: %s pairs, %s unmatched AIS, %s unmatched ARPA", statistics.get('matched', 0), statistics.get('unmatched_ais', 0), statistics.get('unmatched_arpa', 0))
                         
                         # Build response format matching frontend expectations
-                        # Ensure arpa and ais records have 'lng' field (not 'lon')
-                        for pair in matched_pairs:
-                            if pair.get("ais") and "lon" in pair["ais"] and "lng" not in pair["ais"]:
-                                pair["ais"]["lng"] = pair["ais"]["lon"]
-                            if pair.get("arpa") and "lon" in pair["arpa"] and "lng" not in pair["arpa"]:
-                                pair["arpa"]["lng"] = pair["arpa"]["lon"]
-                        
-                        for rec in unmatched_ais:
-                            if "lon" in rec and "lng" not in rec:
-                                rec["lng"] = rec["lon"]
-                        
-                        for rec in unmatched_arpa:
-                            if "lon" in rec and "lng" not in rec:
-                                rec["lng"] = rec["lon"]
+                        # Ensure arpa and ais records have 'lng' field (not 'lon'), in one pass
+                        for rec in chain(
+                            (pair[side] for pair in matched_pairs for side in ("ais", "arpa") if pair.get(side)),
+                            unmatched_ais,
+                            unmatched_arpa
+                        ):
+                            if "lon" in rec:
+                                rec.setdefault("lng", rec["lon"])
                         
                         response_data = {
                             "type": "assignments_weighted",
@@ -484,50 +550,78 @@ class WebSocketListener:
                             "timestamp": datetime.now().isoformat(),
                         }
                         
+                        # Messages are processed concurrently; never replace a newer result
+                        if seq is not None:
+                            if seq < self._last_result_seq:
+                                logger.info("⏭️ Dropping stale matching result for message #%s", seq)
+                                return
+                            self._last_result_seq = seq
+                        
+                        # Encode once for both the external WebSocket and the clients
+                        response_json = orjson_dumps(response_data).decode()
+                        
                         # Send result back to external WebSocket
                         if self._websocket_connection:
                             try:
-                                response_json = json.dumps(response_data, cls=DateTimeEncoder)
                                 await self._websocket_connection.send(response_json)
-                                print(f"📤 Sent matching result to external WebSocket")
+                                logger.info("📤 Sent matching result to external WebSocket")
                             except Exception as e:
-                                print(f"⚠️ Failed to send response to external WebSocket: {e}")
+                                logger.warning("⚠️ Failed to send response to external WebSocket: %s", e)
                         
                         # Broadcast to connected clients
-                        await self.broadcast_to_clients(response_data)
+                        if self.connected_clients:
+                            await self.broadcast(response_json)
                         
                         return
                     else:
-                        print(f"❌ Matching failed: {result.get('message')}")
+                        logger.error("❌ Matching failed: %s", result.get('message'))
                         return
                 else:
-                    print(f"⚠️ Could not extract polygon from camera FOV, skipping query")
+                    logger.warning("⚠️ Could not extract polygon from camera FOV, skipping query")
                     return
             
             # For non-camera FOV messages, return early
-            print(f"⚠️ Non-camera FOV message, ignoring")
+            logger.warning("⚠️ Non-camera FOV message, ignoring")
             return
-            
+        
         except Exception as e:
-            print(f"❌ Error processing message: {e}")
-            import traceback
-            traceback.print_exc()
-            
+            logger.exception("❌ Error processing message: %s", e)
+    
     async def broadcast_to_clients(self, data: dict):
         """Broadcast data to all connected clients."""
-        disconnected_clients = []
-        for client in self.connected_clients:
-            try:
-                # Use DateTimeEncoder to handle datetime objects
-                json_str = json.dumps(data, cls=DateTimeEncoder)
-                await client.send_text(json_str)
-            except Exception as e:
-                print(f"Error sending to client: {e}")
-                disconnected_clients.append(client)
+        if not self.connected_clients:
+            return
+        
+        # Encode once, then fan the same frame out to every client
+        await self.broadcast(orjson_dumps(data).decode())
+    
+    async def broadcast(self, frame: str):
+        """
+        Queue a pre-encoded JSON frame for every connected client.
+        
+        Clients whose queue is full are too slow to keep up and get disconnected,
+        so one stalled consumer never blocks the others.
         
-        # Remove disconnected clients
-        for client in disconnected_clients:
-            self.remove_client(client)
+        Args:
+            frame: Encoded JSON text frame
+        """
+        # Snapshot so clients joining/leaving mid-broadcast don't affect iteration
+        for client, queue in tuple(self.connected_clients.items()):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                logger.warning("⚠️ Client send queue full, disconnecting slow client")
+                self.remove_client(client)
+                task = asyncio.create_task(self._close_slow_client(client))
+                self._close_tasks.add(task)
+                task.add_done_callback(self._close_tasks.discard)
+    
+    async def _close_slow_client(self, websocket: WebSocket):
+        """Close a client dropped by broadcast() with 1013 (try again later)."""
+        try:
+            await websocket.close(code=1013)
+        except Exception as e:
+            logger.warning("Error closing slow client: %s", e)
     
     def start_listener(self) -> dict:
         """
@@ -550,9 +644,9 @@ class WebSocketListener:
         # Create new listener task if not exists or completed
         if self.listener_task is None or self.listener_task.done():
             self.listener_task = asyncio.create_task(self.listen())
-            print("▶️ WebSocket listener STARTED (task created)")
+            logger.info("▶️ WebSocket listener STARTED (task created)")
         else:
-            print("▶️ WebSocket listener STARTED (task already running)")
+            logger.info("▶️ WebSocket listener STARTED (task already running)")
         
         return {
             "status": "started",
@@ -584,9 +678,9 @@ class WebSocketListener:
             try:
                 asyncio.create_task(self._websocket_connection.close())
             except Exception as e:
-                print(f"⚠️ Error closing WebSocket connection: {e}")
+                logger.warning("⚠️ Error closing WebSocket connection: %s", e)
         
-        print("⏸️ WebSocket listener STOPPED")
+        logger.info("⏸️ WebSocket listener STOPPED")
         
         return {
             "status": "stopped",
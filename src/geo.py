@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Tuple, Optional
 import math
+import numpy as np
 import pandas as pd
 
 try:
@@ -14,6 +16,15 @@ def knots_to_mps(knots: float) -> float:
     return float(knots) * 0.514444 if pd.notna(knots) else 0.0
 
 
+def knots_to_mps_array(knots) -> np.ndarray:
+    """Vectorized knots_to_mps: missing values map to 0.0."""
+    if isinstance(knots, np.ndarray) and knots.dtype.kind == "f":
+        arr = knots
+    else:
+        arr = pd.to_numeric(pd.Series(knots), errors="coerce").to_numpy(dtype=float)
+    return np.nan_to_num(arr * 0.514444, nan=0.0)
+
+
 def parse_time_s(ts: Optional[str]) -> float:
     """Parse time string to epoch seconds (naive). Returns 0.0 if invalid."""
     if ts is None:
@@ -26,6 +37,13 @@ def parse_time_s(ts: Optional[str]) -> float:
         return 0.0
 
 
+def parse_time_s_array(ts) -> np.ndarray:
+    """Vectorized parse_time_s: epoch seconds per element, 0.0 where invalid."""
+    t = pd.to_datetime(pd.Series(ts, dtype=object), errors="coerce", utc=True, format="mixed")
+    secs = (t - pd.Timestamp(0, tz="UTC")) / pd.Timedelta(seconds=1)
+    return secs.fillna(0.0).to_numpy(dtype=float)
+
+
 def compute_origin(lat_series: pd.Series, lon_series: pd.Series) -> Tuple[float, float]:
     """Compute a sensible origin for local projection (mean lat/lon)."""
     lat0 = float(lat_series.mean())
@@ -56,8 +74,9 @@ def utm_epsg_for_latlon(lat: float, lon: float) -> int:
         return 32700 + zone  # Southern hemisphere
 
 
+@lru_cache(maxsize=32)
 def make_transformer(lat0: float, lon0: float, method: str = "utm"):
-    """Create a coordinate transformer for given method."""
+    """Create a coordinate transformer for given method (cached per lat0/lon0/method)."""
     if method == "utm" and Transformer is not None:
         epsg = utm_epsg_for_latlon(lat0, lon0)
         try:
@@ -75,4 +94,16 @@ def to_xy(lat: float, lon: float, lat0: float, lon0: float, transformer=None, me
         x, y = transformer.transform(lon, lat)
         return float(x), float(y)
     else:
-        return latlon_to_xy_m(lat, lon, lat0, lon0)
\ No newline at end of file
+        return latlon_to_xy_m(lat, lon, lat0, lon0)
+
+
+def to_xy_array(lat, lon, lat0: float, lon0: float, transformer=None, method: str = "utm") -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized to_xy: project whole lat/lon arrays in a single call."""
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    if method == "utm" and transformer is not None:
+        x, y = transformer.transform(lon, lat)
+        return np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    m_per_deg_lat = 111_320.0
+    m_per_deg_lon = 111_320.0 * math.cos(math.radians(lat0))
+    return (lon - lon0) * m_per_deg_lon, (lat - lat0) * m_per_deg_lat
@@ -4,6 +4,7 @@ from typing import Dict, List, Tuple, Optional
 import numpy as np
 import pandas as pd
 from scipy.optimize import linear_sum_assignment
+from scipy.spatial import cKDTree
 
 
 def angle_diff_deg(a: float, b: float) -> float:
@@ -93,6 +94,35 @@ def feature_score(features: Dict[str, float], p: ScoringParams) -> Dict[str, flo
     }
 
 
+def _column(df: pd.DataFrame, name: str) -> Optional[np.ndarray]:
+    """Column as a float array, or None if the frame doesn't have it."""
+    if name not in df.columns:
+        return None
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+
+
+def _pairs_within(
+    ais_xy: np.ndarray, arpa_xy: np.ndarray, radius: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Index pairs (arpa, ais) whose positions are at most radius apart.
+    Pairs are ordered by ARPA index, then AIS index.
+    """
+    ais_ok = np.flatnonzero(np.isfinite(ais_xy).all(axis=1))
+    arpa_ok = np.flatnonzero(np.isfinite(arpa_xy).all(axis=1))
+    if len(ais_ok) == 0 or len(arpa_ok) == 0:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+    ais_tree = cKDTree(ais_xy[ais_ok])
+    arpa_tree = cKDTree(arpa_xy[arpa_ok])
+    # Widened by a micrometre; the exact gate is applied by the caller
+    neighbours = arpa_tree.query_ball_tree(ais_tree, r=radius + 1e-6)
+    counts = np.fromiter((len(n) for n in neighbours), dtype=np.intp, count=len(neighbours))
+    arpa_idx = np.repeat(arpa_ok, counts)
+    ais_idx = ais_ok[np.fromiter((j for n in neighbours for j in sorted(n)), dtype=np.intp, count=int(counts.sum()))]
+    return arpa_idx, ais_idx
+
+
 def build_candidates(
     ais_df: pd.DataFrame,
     arpa_df: pd.DataFrame,
@@ -103,26 +133,74 @@ def build_candidates(
     """
     Build candidate ARPA↔AIS pairs within gates and compute feature-based scores.
     Returns a list of dicts with keys: arpa_id, ais_id, s_total, d_m, dv_ms, dtheta_deg, dt_s
+
+    Only pairs within gating_distance_m are considered (found with a KD-tree),
+    and their features and scores are computed as whole arrays.
     """
-    scoring_params = scoring_params or ScoringParams()
+    p = scoring_params or ScoringParams()
+    if len(ais_df) == 0 or len(arpa_df) == 0:
+        return []
+
+    ais_xy = np.column_stack([_column(ais_df, "x"), _column(ais_df, "y")])
+    arpa_xy = np.column_stack([_column(arpa_df, "x"), _column(arpa_df, "y")])
+    i_arpa, i_ais = _pairs_within(ais_xy, arpa_xy, gating_distance_m)
+
+    # Features for the spatially gated pairs (same definitions as extract_features)
+    d_m = np.hypot(arpa_xy[i_arpa, 0] - ais_xy[i_ais, 0], arpa_xy[i_arpa, 1] - ais_xy[i_ais, 1])
+    dv_ms = np.abs(_column(arpa_df, "speed_ms")[i_arpa] - _column(ais_df, "sog_ms")[i_ais])
+    dtheta_deg = np.abs((_column(arpa_df, "heading_deg")[i_arpa] - _column(ais_df, "cog_deg")[i_ais]) % 360.0)
+    dtheta_deg = np.where(dtheta_deg > 180.0, 360.0 - dtheta_deg, dtheta_deg)
+    dt_s = np.abs(_column(arpa_df, "timestamp_s")[i_arpa] - _column(ais_df, "timestamp_s")[i_ais])
+
+    keep = (d_m <= gating_distance_m) & (dt_s <= time_gate_s)
+    i_arpa, i_ais = i_arpa[keep], i_ais[keep]
+    feats = {
+        "d_m": d_m[keep],
+        "dv_ms": dv_ms[keep],
+        "dtheta_deg": dtheta_deg[keep],
+        "dt_s": dt_s[keep],
+    }
+
+    # Optional ARPA geometry comparison: compare ARPA measured (range/bearing) to AIS radial from site
+    optional = {}
+    r_meas, r_site = _column(arpa_df, "r_meas_m"), _column(ais_df, "r_site_m")
+    if r_meas is not None and r_site is not None:
+        optional["range_error_m"] = np.abs(r_meas[i_arpa] - r_site[i_ais])
+    brg_meas, brg_site = _column(arpa_df, "brg_meas_deg"), _column(ais_df, "brg_site_deg")
+    if brg_meas is not None and brg_site is not None:
+        err = np.abs((brg_meas[i_arpa] - brg_site[i_ais]) % 360.0)
+        optional["bearing_error_deg"] = np.where(err > 180.0, 360.0 - err, err)
+
+    # Scores (same definitions as feature_score)
+    s_total = (
+        p.w_pos * np.exp(-((feats["d_m"] / p.pos_sigma_m) ** 2))
+        + p.w_spd * np.exp(-((feats["dv_ms"] / p.spd_sigma_ms) ** 2))
+        + p.w_brg * np.exp(-((feats["dtheta_deg"] / p.hdg_sigma_deg) ** 2))
+        + p.w_time * np.exp(-((feats["dt_s"] / p.time_sigma_s) ** 2))
+    )
+    if "range_error_m" in optional and p.range_sigma_m and p.range_sigma_m > 0.0:
+        s_range = np.exp(-((optional["range_error_m"] / p.range_sigma_m) ** 2))
+        s_total = s_total + p.w_range * np.nan_to_num(s_range, nan=0.0)
+    if "bearing_error_deg" in optional and p.brg_geo_sigma_deg and p.brg_geo_sigma_deg > 0.0:
+        s_brg_geo = np.exp(-((optional["bearing_error_deg"] / p.brg_geo_sigma_deg) ** 2))
+        s_total = s_total + p.w_brg_geo * np.nan_to_num(s_brg_geo, nan=0.0)
+
+    arpa_ids = arpa_df["arpa_id"].tolist()
+    ais_ids = ais_df["ais_id"].tolist()
+    s_total = s_total.tolist()
+    columns = {name: values.tolist() for name, values in feats.items()}
+    optional = {name: values.tolist() for name, values in optional.items()}
+
     candidates: List[Dict[str, float]] = []
-    # Pre-index rows by id for later lookup
-    ais_index = {row["ais_id"]: i for i, row in ais_df.iterrows()}
-    arpa_index = {row["arpa_id"]: i for i, row in arpa_df.iterrows()}
-
-    for _, a_row in arpa_df.iterrows():
-        for _, i_row in ais_df.iterrows():
-            feats = extract_features(i_row, a_row)
-            if feats["d_m"] <= gating_distance_m and feats["dt_s"] <= time_gate_s:
-                scores = feature_score(feats, scoring_params)
-                candidates.append(
-                    {
-                        "arpa_id": a_row["arpa_id"],
-                        "ais_id": i_row["ais_id"],
-                        "s_total": scores["s_total"],
-                        **feats,
-                    }
-                )
+    for k, (a, i) in enumerate(zip(i_arpa.tolist(), i_ais.tolist())):
+        candidate = {"arpa_id": arpa_ids[a], "ais_id": ais_ids[i], "s_total": s_total[k]}
+        for name, values in columns.items():
+            candidate[name] = values[k]
+        for name, values in optional.items():
+            # Missing measurements leave the optional feature out
+            if not np.isnan(values[k]):
+                candidate[name] = values[k]
+        candidates.append(candidate)
     return candidates
 
 
@@ -0,0 +1,218 @@
+"""
+Request-level tests for the API routes.
+Run with pytest; ClickHouse and Redis are replaced with local stand-ins.
+"""
+import asyncio
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.api import routes
+from app.services.cache import DataCache, _ADD_SCRIPT
+
+
+@pytest.fixture
+def client():
+    """Test client without lifespan, so no listener or pool is started."""
+    return TestClient(app)
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """Fresh in-memory DataCache wired into the routes."""
+    monkeypatch.setattr(DataCache, "_init_redis", lambda self: None)
+    cache = DataCache(max_size=100, ttl_seconds=3600)
+    monkeypatch.setattr(routes, "data_cache", cache)
+    return cache
+
+
+def test_health_is_cached(client, memory_cache, monkeypatch):
+    """Probes within the cache TTL share one backend check."""
+    calls = []
+
+    async def fake_test_connection():
+        calls.append(1)
+        return True
+
+    monkeypatch.setattr(routes.clickhouse_service, "test_connection", fake_test_connection)
+    monkeypatch.setattr(routes, "_health_cache", None)
+
+    first = client.get("/health")
+    second = client.get("/health")
+
+    assert first.status_code == 200
+    assert first.json()["clickhouse"] == "connected"
+    assert first.json()["redis"] == "disconnected"
+    assert second.content == first.content
+    assert len(calls) == 1
+
+    # An expired entry triggers a fresh check
+    monkeypatch.setattr(routes, "_HEALTH_CACHE_TTL_S", 0.0)
+    client.get("/health")
+    assert len(calls) == 2
+
+
+def test_ws_initial_frame(client, memory_cache, monkeypatch):
+    """New /ws clients first receive the recent cache contents."""
+    monkeypatch.setattr(routes, "_initial_frame_cache", None)
+    memory_cache.add({"id": 1})
+
+    with client.websocket_connect("/ws") as ws:
+        frame = ws.receive_json()
+
+    assert frame["type"] == "initial_data"
+    assert [item["data"] for item in frame["data"]] == [{"id": 1}]
+    assert frame["cache_stats"]["backend"] == "memory"
+    assert frame["timestamp"]
+
+
+def test_initial_frame_rebuilt_after_ttl(memory_cache, monkeypatch):
+    """The cached frame is re-stamped per send and rebuilt once its TTL passes."""
+    monkeypatch.setattr(routes, "_initial_frame_cache", None)
+    reads = []
+    get_recent = memory_cache.get_recent
+    monkeypatch.setattr(memory_cache, "get_recent", lambda limit: reads.append(limit) or get_recent(limit))
+
+    timestamps = iter(["2024-01-01T00:00:00.000", "2024-01-01T00:00:00.500", "2024-01-01T00:00:02.000"])
+    monkeypatch.setattr(routes, "_now_iso", lambda: next(timestamps))
+
+    first = routes._get_initial_frame()
+    second = routes._get_initial_frame()
+    assert len(reads) == 1
+    assert orjson.loads(first)["timestamp"] == "2024-01-01T00:00:00.000"
+    assert orjson.loads(second)["timestamp"] == "2024-01-01T00:00:00.500"
+
+    # Writes from other processes don't bump the local version; the TTL catches them
+    monkeypatch.setattr(routes, "_INITIAL_FRAME_TTL_S", 0.0)
+    routes._get_initial_frame()
+    assert len(reads) == 2
+
+
+def test_ws_acks(client, memory_cache, monkeypatch):
+    """Without batching every client message gets its own "received" ack."""
+    monkeypatch.setattr(routes, "_initial_frame_cache", None)
+
+    with client.websocket_connect("/ws") as ws:
+        ws.receive_json()
+        ws.send_text("ping")
+        ack = ws.receive_json()
+
+    assert ack["status"] == "received"
+    assert ack["message"] == "ping"
+
+
+def test_ws_batch_acks(client, memory_cache, monkeypatch):
+    """With ?batch=1 pipelined messages are acknowledged in order, in batches."""
+    monkeypatch.setattr(routes, "_initial_frame_cache", None)
+    sent = [f"msg-{i}" for i in range(5)]
+
+    with client.websocket_connect("/ws?batch=1") as ws:
+        ws.receive_json()
+        for message in sent:
+            ws.send_text(message)
+
+        acked = []
+        while len(acked) < len(sent):
+            frame = ws.receive_json()
+            assert frame["type"] == "batch_ack"
+            assert 1 <= len(frame["messages"]) <= routes._WS_BATCH_MAX
+            acked.extend(frame["messages"])
+
+    assert acked == sent
+
+
+def test_cache_stats_etag(client, memory_cache):
+    """/cache/stats revalidates against the body, not just the local write counter."""
+    first = client.get("/cache/stats")
+    etag = first.headers["etag"]
+
+    unchanged = client.get("/cache/stats", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+
+    # Counters and backend change without a local write
+    memory_cache._stats["cache_hits"] += 1
+    changed = client.get("/cache/stats", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["cache_hits"] == 1
+    assert changed.headers["etag"] != etag
+
+
+def test_cache_recent_etag(client, memory_cache):
+    """/cache/recent returns 304 until new data arrives."""
+    memory_cache.add({"id": 1})
+    first = client.get("/cache/recent")
+    etag = first.headers["etag"]
+    assert client.get("/cache/recent", headers={"If-None-Match": etag}).status_code == 304
+
+    memory_cache.add({"id": 2})
+    changed = client.get("/cache/recent", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.json()["data"]) == 2
+
+
+@pytest.mark.parametrize("params", [{}, {"since": 0, "limit": 10}])
+def test_cache_recent_etag_redis(client, memory_cache, params):
+    """Repeated polls against Redis revalidate even though reads bump hit counters."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis needs it to run the add script
+    memory_cache._redis_client = fakeredis.FakeRedis()
+    memory_cache._add_script = memory_cache._redis_client.register_script(_ADD_SCRIPT)
+    memory_cache._redis_available = True
+    memory_cache.add({"id": 1})
+
+    first = client.get("/cache/recent", params=params)
+    assert first.status_code == 200
+    assert first.json()["stats"]["backend"] == "redis"
+    assert "cache_hits" not in first.json()["stats"]
+
+    etag = first.headers["etag"]
+    again = client.get("/cache/recent", params=params, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert memory_cache.get_stats()["cache_hits"] == 2
+
+    memory_cache.add({"id": 2})
+    changed = client.get("/cache/recent", params=params, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.json()["data"]) == 2
+
+
+def test_enqueue_never_blocks():
+    """Frames for a dead writer or a full queue are refused instead of awaited."""
+    async def scenario():
+        queue = asyncio.Queue(maxsize=1)
+        writer = asyncio.create_task(asyncio.sleep(3600))
+        try:
+            assert routes._enqueue(queue, writer, "a")
+            assert not routes._enqueue(queue, writer, "b")  # Client not reading
+        finally:
+            writer.cancel()
+        await asyncio.sleep(0)
+        queue.get_nowait()
+        assert not routes._enqueue(queue, writer, "c")  # Writer has stopped
+
+    asyncio.run(scenario())
+
+
+def test_cache_recent_since_pages_through_backlog(client, memory_cache):
+    """Following "next" returns every item once, oldest first."""
+    for i in range(13):
+        memory_cache.add({"id": i})
+
+    page = client.get("/cache/recent", params={"since": 3, "limit": 2}).json()
+    assert [row["seq"] for row in page["data"]] == [4, 5]
+    assert page["next"] == 5
+
+    seen = []
+    since = 3
+    while True:
+        page = client.get("/cache/recent", params={"since": since, "limit": 2}).json()
+        if not page["data"]:
+            break
+        seen.extend(row["data"]["id"] for row in page["data"])
+        since = page["next"]
+
+    assert seen == list(range(3, 13))
+    assert page["next"] == 13
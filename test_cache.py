@@ -0,0 +1,106 @@
+"""
+Tests for the Redis-backed data cache and its in-memory fallback.
+Run with pytest; the Redis tests use fakeredis and are skipped without it.
+"""
+import time
+from datetime import timedelta
+
+import pytest
+
+from app.services.cache import DataCache, _ADD_SCRIPT
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """DataCache that never connects to Redis."""
+    monkeypatch.setattr(DataCache, "_init_redis", lambda self: None)
+    return DataCache(max_size=100, ttl_seconds=3600)
+
+
+@pytest.fixture
+def redis_cache(memory_cache):
+    """DataCache backed by an in-process fake Redis."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis needs it to run Lua scripts
+    memory_cache._redis_client = fakeredis.FakeRedis()
+    memory_cache._add_script = memory_cache._redis_client.register_script(_ADD_SCRIPT)
+    memory_cache._redis_available = True
+    return memory_cache
+
+
+def _page_all(cache: DataCache, since: int, limit: int) -> list:
+    """Follow the since cursor until no more items come back."""
+    seqs = []
+    while True:
+        page = cache.get_since(since, limit=limit)
+        if not page:
+            return seqs
+        assert len(page) <= limit
+        seqs.extend(item["seq"] for item in page)
+        since = page[-1]["seq"]
+
+
+@pytest.mark.parametrize("backend", ["memory_cache", "redis_cache"])
+def test_get_since_pages_oldest_first(backend, request):
+    """Items after the cursor come back in seq order, limit at a time, none skipped."""
+    cache = request.getfixturevalue(backend)
+    for i in range(13):
+        cache.add({"id": i})
+
+    page = cache.get_since(3, limit=2)
+    assert [item["seq"] for item in page] == [4, 5]
+    assert [item["data"]["id"] for item in page] == [3, 4]
+
+    assert _page_all(cache, 3, limit=2) == list(range(4, 14))
+    assert cache.get_since(13, limit=2) == []
+
+
+@pytest.mark.parametrize("backend", ["memory_cache", "redis_cache"])
+def test_get_since_skips_expired(backend, request):
+    """Expired items are never returned and don't stall the cursor."""
+    cache = request.getfixturevalue(backend)
+    for i in range(3):
+        cache.add({"id": i})
+    time.sleep(0.05)
+    cache.ttl = timedelta(milliseconds=40)  # The items above are now expired
+    cache.add({"id": 3})
+
+    page = cache.get_since(0, limit=1)
+    assert [item["data"]["id"] for item in page] == [3]
+    assert page[0]["seq"] == 4
+
+
+def test_seq_continues_across_failover(redis_cache):
+    """Memory and Redis share one sequence, so a cursor stays valid after failover."""
+    for i in range(3):
+        redis_cache.add({"id": i})
+
+    # Redis goes away: the fallback continues the sequence
+    redis_cache._redis_available = False
+    redis_cache.add({"id": 3})
+    assert [item["seq"] for item in redis_cache.get_since(3)] == [4]
+
+    # Redis comes back: its counter is raised past the memory items
+    redis_cache._redis_available = True
+    redis_cache._raise_redis_seq()
+    redis_cache.add({"id": 4})
+    assert [item["seq"] for item in redis_cache.get_since(3)] == [5]
+
+
+def test_redis_add_is_one_round_trip(redis_cache, monkeypatch):
+    """Once the script is loaded, add() sends a single command."""
+    redis_cache.add({"id": 0})  # Loads the script
+
+    commands = []
+    execute_command = redis_cache._redis_client.execute_command
+
+    def counting_execute_command(*args, **kwargs):
+        commands.append(args[0])
+        return execute_command(*args, **kwargs)
+
+    monkeypatch.setattr(redis_cache._redis_client, "execute_command", counting_execute_command)
+    redis_cache.add({"id": 1})
+
+    assert commands == ["EVALSHA"]
+    assert [item["data"] for item in redis_cache.get_recent()] == [{"id": 1}, {"id": 0}]
+    assert [item["seq"] for item in redis_cache.get_since(0)] == [1, 2]
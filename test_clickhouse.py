@@ -0,0 +1,195 @@
+"""
+Tests for the ClickHouse client pool and service.
+Run with pytest; clients are local stand-ins, no server is contacted.
+"""
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from clickhouse_connect.driver.exceptions import DatabaseError, OperationalError
+
+from app.services.clickhouse import ASYNC_INSERT_SETTINGS, ClickHousePool, ClickHouseService
+
+
+class FakeClient:
+    """Stand-in for a clickhouse-connect client that records inserts."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.id = next(self._ids)
+        self.closed = False
+        self.inserts = []
+
+    def insert(self, table, data, column_names=None, column_oriented=False, settings=None):
+        self.inserts.append({
+            "table": table,
+            "data": data,
+            "column_names": column_names,
+            "column_oriented": column_oriented,
+            "settings": settings
+        })
+        return SimpleNamespace(written_rows=len(data[0]) if column_oriented else len(data))
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_caps_concurrent_clients():
+    """No more than max_size clients exist; extra callers wait for a free one."""
+    async def scenario():
+        pool = ClickHousePool(FakeClient, min_size=0, max_size=2)
+        release = asyncio.Event()
+        borrowed = []
+
+        async def borrow():
+            async with pool.acquire() as client:
+                borrowed.append(client)
+                await release.wait()
+
+        tasks = [asyncio.create_task(borrow()) for _ in range(3)]
+        # Clients are created in worker threads; wait until the pool is saturated
+        while len(borrowed) < 2:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        in_flight = len(borrowed)
+        stats = pool.get_stats()
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return in_flight, stats, pool.get_stats(), borrowed
+
+    in_flight, during, after, borrowed = asyncio.run(scenario())
+    assert in_flight == 2
+    assert during["in_use"] == 2
+    assert during["waits"] == 1
+    assert after["created"] == 2
+    assert after["size"] == 2
+    assert after["idle"] == 2
+    assert len(borrowed) == 3
+    assert borrowed[2] in borrowed[:2]  # The waiter reused a returned client
+
+
+def test_pool_discards_client_on_operational_error():
+    """Transport errors drop the client instead of returning it."""
+    async def scenario():
+        pool = ClickHousePool(FakeClient, min_size=1, max_size=2)
+        await pool.open()
+        with pytest.raises(OperationalError):
+            async with pool.acquire() as client:
+                raise OperationalError("connection reset")
+        return pool.get_stats(), client
+
+    stats, client = asyncio.run(scenario())
+    assert client.closed
+    assert stats["discarded"] == 1
+    assert stats["size"] == 0
+    assert stats["in_use"] == 0
+
+
+def test_pool_keeps_client_after_server_error():
+    """A query the server rejected leaves the client usable and pooled."""
+    async def scenario():
+        pool = ClickHousePool(FakeClient, min_size=1, max_size=2)
+        await pool.open()
+        with pytest.raises(DatabaseError):
+            async with pool.acquire() as first:
+                raise DatabaseError("Syntax error")
+        async with pool.acquire() as second:
+            pass
+        return pool.get_stats(), first, second
+
+    stats, first, second = asyncio.run(scenario())
+    assert second is first
+    assert not first.closed
+    assert stats["discarded"] == 0
+    assert stats["size"] == 1
+    assert stats["idle"] == 1
+
+
+def test_pool_discards_client_on_cancellation():
+    """A request cancelled mid-query frees its slot and doesn't leak the client."""
+    async def scenario():
+        pool = ClickHousePool(FakeClient, min_size=1, max_size=1)
+        await pool.open()
+        started = asyncio.Event()
+
+        async def query():
+            async with pool.acquire():
+                started.set()
+                await asyncio.sleep(3600)
+
+        task = asyncio.create_task(query())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The slot is free again
+        async with pool.acquire() as client:
+            pass
+        return pool.get_stats(), client
+
+    stats, client = asyncio.run(scenario())
+    assert stats["discarded"] == 1
+    assert stats["created"] == 2
+    assert stats["size"] == 1
+    assert stats["in_use"] == 0
+    assert not client.closed
+
+
+@pytest.fixture
+def service():
+    """ClickHouseService whose pool hands out a single FakeClient."""
+    service = ClickHouseService()
+    client = FakeClient()
+    service.pool = ClickHousePool(lambda: client, min_size=0, max_size=1)
+    service.fake_client = client
+    return service
+
+
+def test_insert_batch_rows(service):
+    """Row-oriented batches go to client.insert in one call, without insert settings."""
+    rows = [(1, "a"), (2, "b")]
+    ok = asyncio.run(service.insert_batch("css.events", rows, ["id", "name"]))
+
+    assert ok
+    assert service.fake_client.inserts == [{
+        "table": "css.events",
+        "data": rows,
+        "column_names": ["id", "name"],
+        "column_oriented": False,
+        "settings": None
+    }]
+
+
+def test_insert_batch_columns_async(service):
+    """Column-oriented data and server-side async inserts are passed through."""
+    columns = [[1, 2, 3], ["a", "b", "c"]]
+    ok = asyncio.run(service.insert_batch(
+        "css.events", columns, ["id", "name"], column_oriented=True, async_insert=True
+    ))
+
+    assert ok
+    insert = service.fake_client.inserts[0]
+    assert insert["data"] == columns
+    assert insert["column_oriented"] is True
+    assert insert["settings"] == ASYNC_INSERT_SETTINGS
+    # Fire-and-forget: the insert returns before the server has flushed it
+    assert insert["settings"]["wait_for_async_insert"] == 0
+
+
+def test_insert_batch_empty_and_failure(service, monkeypatch):
+    """Empty batches skip the server; failed inserts report False and keep the client."""
+    assert asyncio.run(service.insert_batch("css.events", [], ["id"]))
+    assert service.fake_client.inserts == []
+
+    def failing_insert(*args, **kwargs):
+        raise DatabaseError("Table css.events doesn't exist")
+
+    monkeypatch.setattr(service.fake_client, "insert", failing_insert)
+    assert not asyncio.run(service.insert_batch("css.events", [(1,)], ["id"]))
+    stats = service.get_pool_stats()
+    assert stats["discarded"] == 0
+    assert stats["idle"] == 1
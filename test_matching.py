@@ -6,6 +6,7 @@ import pandas as pd
 import numpy as np
 from src.matching import ScoringParams, build_candidates, assign_one_to_one
 from src.geo import make_transformer, to_xy, parse_time_s, knots_to_mps
+from src.geo import to_xy_array, parse_time_s_array, knots_to_mps_array
 
 
 def test_coordinate_transformation():
@@ -223,6 +224,31 @@ def test_edge_cases():
     print("\n✓ Edge cases test passed!")
 
 
+def test_vectorized_conversions():
+    """Test vectorized conversions agree with the per-row helpers."""
+    print("\n" + "="*60)
+    print("TEST 4: Vectorized Conversions")
+    print("="*60)
+    
+    site_lat, site_lon = -1.279656, 116.809655
+    lats = [-1.28, -1.29, -1.30]
+    lons = [116.81, 116.82, 116.83]
+    
+    for transformer in (None, make_transformer(site_lat, site_lon, method="utm")):
+        xs, ys = to_xy_array(lats, lons, site_lat, site_lon, transformer)
+        for lat, lon, x, y in zip(lats, lons, xs, ys):
+            ex, ey = to_xy(lat, lon, site_lat, site_lon, transformer)
+            assert np.isclose(x, ex) and np.isclose(y, ey)
+    
+    speeds = pd.Series([10.5, None, 0.0, 12.0])
+    assert np.allclose(knots_to_mps_array(speeds), [knots_to_mps(v) for v in speeds])
+    
+    times = ["2023-11-14T22:13:20", "2023-11-14T22:13:20Z", None, "not a time"]
+    assert np.allclose(parse_time_s_array(times), [parse_time_s(t) for t in times])
+    
+    print("\n✓ Vectorized conversions test passed!")
+
+
 def main():
     """Run all tests."""
     print("\n" + "="*60)
@@ -233,6 +259,7 @@ def main():
         test_coordinate_transformation()
         test_matching_algorithm()
         test_edge_cases()
+        test_vectorized_conversions()
         
         print("\n" + "="*60)
         print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,59 @@
+"""
+Tests for the queries built by the matching controller.
+Run with pytest; ClickHouse is replaced by a stub that records each query.
+"""
+import asyncio
+
+import pytest
+
+# Import services first; the services and controllers packages import each other
+from app.services.clickhouse import clickhouse_service
+from app.controllers.matching_controller import matching_controller
+
+POLYGON = [[[116.4, -0.8], [116.4, -2.8], [118.7, -2.8], [118.7, -0.8], [116.4, -0.8]]]
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    """Record the SQL and parameters sent to ClickHouse."""
+    calls = []
+
+    async def fake_execute_query(query, parameters=None, columnar=False):
+        calls.append((query, parameters))
+        return None
+
+    monkeypatch.setattr(clickhouse_service, "execute_query", fake_execute_query)
+    return calls
+
+
+@pytest.mark.parametrize("fetch, key", [
+    ("fetch_ais_data", "mmsi"),
+    ("fetch_arpa_data", "target"),
+])
+def test_dedup_runs_before_spatial_filter(fetch, key, captured, monkeypatch):
+    """The latest row per key is picked first, then filtered by area."""
+    monkeypatch.setattr(matching_controller, "use_final", False)
+    asyncio.run(getattr(matching_controller, fetch)(since_minutes=60, limit=10, polygon=POLYGON))
+
+    query, params = captured[0]
+    dedup = query.index(f"LIMIT 1 BY {key}")
+    subquery_end = query.index(")", dedup)
+    assert query.index("FROM (") < dedup
+    assert subquery_end < query.index("lat BETWEEN")
+    assert subquery_end < query.index("pointInPolygon")
+    assert "FINAL" not in query
+    assert params["polygon"] == [tuple(point) for point in POLYGON[0]]
+
+
+@pytest.mark.parametrize("fetch, table", [
+    ("fetch_ais_data", "css.ais_current"),
+    ("fetch_arpa_data", "css.arpa_current"),
+])
+def test_final_reads_table_directly(fetch, table, captured, monkeypatch):
+    """With USE_FINAL the table is merged by FINAL and not deduplicated again."""
+    monkeypatch.setattr(matching_controller, "use_final", True)
+    asyncio.run(getattr(matching_controller, fetch)(since_minutes=60, limit=10, polygon=POLYGON))
+
+    query, _ = captured[0]
+    assert f"FROM {table} FINAL" in query
+    assert "LIMIT 1 BY" not in query
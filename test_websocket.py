@@ -0,0 +1,86 @@
+"""
+Tests for the WebSocket listener service.
+Run with pytest; no external WebSocket or ClickHouse connection is made.
+"""
+import asyncio
+
+import pandas as pd
+
+from app.services.websocket import WebSocketListener
+
+
+class FakeClient:
+    """Stand-in for a FastAPI WebSocket that records how it was closed."""
+
+    def __init__(self, fail_close: bool = False):
+        self.close_codes = []
+        self.fail_close = fail_close
+
+    async def close(self, code: int = 1000):
+        self.close_codes.append(code)
+        if self.fail_close:
+            raise RuntimeError("socket already gone")
+
+
+def test_broadcast_drops_slow_client():
+    """A client whose queue is full is removed and closed with 1013."""
+    async def scenario():
+        listener = WebSocketListener()
+        listener.client_queue_size = 1
+        slow, failing, fast = FakeClient(), FakeClient(fail_close=True), FakeClient()
+        listener.add_client(slow)
+        listener.add_client(failing)
+        fast_queue = listener.add_client(fast)
+
+        await listener.broadcast("first")
+        fast_queue.get_nowait()  # Only the fast client keeps up
+        await listener.broadcast("second")
+
+        assert set(listener.connected_clients) == {fast}
+        assert len(listener._close_tasks) == 2
+
+        # Close tasks are tracked until done, including ones that fail
+        await asyncio.gather(*listener._close_tasks)
+        await asyncio.sleep(0)
+        return listener, slow, failing, fast, fast_queue
+
+    listener, slow, failing, fast, fast_queue = asyncio.run(scenario())
+    assert slow.close_codes == [1013]
+    assert failing.close_codes == [1013]
+    assert fast.close_codes == []
+    assert fast_queue.get_nowait() == "second"
+    assert not listener._close_tasks
+
+
+def test_frame_from_cache_matches_per_record_defaults():
+    """Frames equal the old record.get(key, default) construction, explicit None included."""
+    ais_cache = {
+        "525000001": {"lat": -1.2, "lon": 116.8, "sog": 5.5, "cog": 90.0, "heading": 91.0,
+                      "ts": "2024-01-01T00:00:00", "ship_name": "ALPHA", "ship_type": 70},
+        "525000002": {"lat": -1.3, "lon": 116.9, "sog": None, "ship_name": None, "extra": 1},
+        "525000003": {"lat": -1.4, "lon": 117.0},
+    }
+    expected = pd.DataFrame([
+        {
+            "mmsi": mmsi,
+            "lat": record.get("lat"),
+            "lon": record.get("lon"),
+            "sog": record.get("sog", 0.0),
+            "cog": record.get("cog"),
+            "heading": record.get("heading"),
+            "heading_az": record.get("heading_az"),
+            "ts": record.get("ts"),
+            "ship_name": record.get("ship_name", ""),
+            "ship_type": record.get("ship_type", 0)
+        }
+        for mmsi, record in ais_cache.items()
+    ])
+
+    frame = WebSocketListener._frame_from_cache(
+        ais_cache, "mmsi", WebSocketListener._AIS_COLUMNS, WebSocketListener._AIS_DEFAULTS
+    )
+
+    pd.testing.assert_frame_equal(frame, expected)
+    # Explicit None stays null; only missing keys take the default
+    assert pd.isna(frame.loc[1, "ship_name"]) and pd.isna(frame.loc[1, "sog"])
+    assert frame.loc[2, "ship_name"] == "" and frame.loc[2, "sog"] == 0.0